@@ -1,4 +1,5 @@
 """Configuration globale de l'API"""
+import os
 from typing import Dict
 
 class Config:
@@ -12,6 +13,9 @@ class Config:
     # CORS
     CORS_ORIGINS = ["*"]
     
+    # Logging (DEBUG pour retrouver les diagnostics détaillés)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    
     # Paramètres par défaut (du papier Nature) - PCSK1/2
     DEFAULT_SIGNAL_PEPTIDE_LENGTH = 20
     DEFAULT_MIN_CLEAVAGE_SITES = 4
@@ -46,7 +50,7 @@ class Config:
         # ⭐ NOUVEAU : MODE PCSK5/6/7
         # Motif : R-X-(K/R)-R où X = n'importe quel acide aminé
         # Exemples : RSKR, RKRR, RVRR, RARR, RHRR, etc.
-        "pcsk567": r"R[A-Z](?:K|R)R"
+        "pcsk567": r"R[A-Z][KR]R"
     }
     
     @classmethod
@@ -5,7 +5,11 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Union, List
 import asyncio
 import aiohttp
+import logging
+import logging.handlers
+import queue
 
+from api.config import config
 from api.services import (
     SequenceValidator,
     CleavageDetector,
@@ -22,6 +26,25 @@ from api.services import (
 
 app = FastAPI(title="Peptide Predictor API")
 
+# Logging : les handlers ne font que poser le record dans une file,
+# l'écriture sur stdout se fait dans le thread du QueueListener
+# (aucune I/O bloquante dans la boucle asyncio)
+_log_queue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+
+_api_logger = logging.getLogger("api")
+_api_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_api_logger.propagate = False
+
+# LOG_LEVEL inconnu (ex: "VERBOSE") : INFO plutôt qu'un crash au démarrage
+if config.LOG_LEVEL in logging.getLevelNamesMapping():
+    _api_logger.setLevel(config.LOG_LEVEL)
+else:
+    _api_logger.setLevel(logging.INFO)
+    _api_logger.warning("⚠️ LOG_LEVEL %r inconnu, INFO utilisé", config.LOG_LEVEL)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -61,6 +84,11 @@ class AnalysisRequest(BaseModel):
         return v
 
 
+class BatchAnalysisRequest(BaseModel):
+    """Plusieurs requêtes /analyze envoyées en une seule fois"""
+    requests: List[AnalysisRequest] = Field(min_length=1, max_length=50)
+
+
 # ==================== ENDPOINTS ====================
 
 @app.get("/")
@@ -288,7 +316,7 @@ async def analyze_protein(request: AnalysisRequest):
         
         async with aiohttp.ClientSession() as session:
             # Récupérer la protéine
-            protein = await protein_db.get_protein(request.proteinId, session)
+            protein = await protein_db.get_protein(request.proteinId)
             
             if not protein:
                 raise HTTPException(
@@ -296,10 +324,10 @@ async def analyze_protein(request: AnalysisRequest):
                     detail=f"Protein {request.proteinId} not found or not secreted"
                 )
             
-            clean_seq = protein["sequence"]
-            gene_name = protein["geneName"]
-            protein_name = protein["proteinName"]
-            accession = protein["accession"]
+            clean_seq = protein.sequence
+            gene_name = protein.geneName
+            protein_name = protein.proteinName
+            accession = protein.accession
             
             protein_id = f"SP|{accession}|{gene_name}_HUMAN {protein_name}"
             
@@ -353,7 +381,6 @@ async def analyze_protein(request: AnalysisRequest):
             # UniProt check
             uniprot_results = await UniProtChecker.check_batch(
                 [p['sequence'] for p in peptides],
-                session,
                 protein_id=protein_id
             )
             
@@ -438,22 +465,67 @@ async def analyze_protein(request: AnalysisRequest):
         )
 
 
+@app.post("/analyze/batch")
+async def analyze_protein_batch(batch: BatchAnalysisRequest):
+    """
+    Exécute plusieurs analyses /analyze en un seul aller-retour HTTP
+    
+    Chaque requête est traitée comme par /analyze (mêmes paramètres, mêmes
+    ajustements PCSK5/6/7), en parallèle. Les réponses gardent l'ordre des
+    requêtes : {"status": code HTTP, "data": ...} ou {"status": ..., "detail": ...}
+    """
+    async def run(request: AnalysisRequest) -> dict:
+        try:
+            return {"status": 200, "data": await analyze_protein(request)}
+        except HTTPException as e:
+            return {"status": e.status_code, "detail": e.detail}
+        except Exception as e:
+            return {"status": 500, "detail": str(e)}
+    
+    # Une requête UniProt groupée pour toutes les protéines demandées : chaque
+    # analyse retrouve ensuite sa protéine dans le cache de protein_db.
+    # IDs passés tels quels (même clé de cache que get_protein) : seuls ceux
+    # au format UniProt entrent dans la requête groupée, les autres sont
+    # traités par get_protein dans leur propre analyse
+    protein_ids = [
+        r.proteinId for r in batch.requests
+        if isinstance(r.proteinId, str) and not r.fastaSequence
+    ]
+    if protein_ids:
+        await protein_db.get_proteins_bulk(protein_ids)
+    
+    responses = await asyncio.gather(*(run(r) for r in batch.requests))
+    return {"responses": responses}
+
+
 @app.get("/api/proteins/search")
 async def search_proteins(q: str, type: str = "gene_name", limit: int = 10):
     """Recherche de protéines dans UniProt"""
-    async with aiohttp.ClientSession() as session:
-        results = await protein_db.search_proteins(q, type, limit, session)
-        return results
+    # Session partagée de protein_db : pas de nouvelle connexion par requête
+    results = await protein_db.search_proteins(q, type, limit)
+    return [protein.to_dict() for protein in results]
 
 
 @app.get("/api/proteins/{accession}")
 async def get_protein(accession: str):
     """Récupère les détails d'une protéine"""
-    async with aiohttp.ClientSession() as session:
-        protein = await protein_db.get_protein(accession, session)
-        if not protein:
-            raise HTTPException(status_code=404, detail="Protein not found")
-        return protein
+    protein = await protein_db.get_protein(accession)
+    if not protein:
+        raise HTTPException(status_code=404, detail="Protein not found")
+    return protein.to_dict()
+
+
+@app.on_event("startup")
+async def start_logging():
+    """Démarre le thread d'écriture des logs"""
+    _log_listener.start()
+
+
+@app.on_event("shutdown")
+async def close_sessions():
+    """Ferme la session UniProt partagée et vide la file de logs à l'arrêt"""
+    await protein_db.close()
+    _log_listener.stop()
 
 
 if __name__ == "__main__":
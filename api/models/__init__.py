@@ -4,6 +4,7 @@ from .schemas import (
     AnalysisResponse,
     PeptideResult,
     CleavageSite,
+    Protein,
     HealthResponse
 )
 
@@ -12,5 +13,6 @@ __all__ = [
     "AnalysisResponse",
     "PeptideResult",
     "CleavageSite",
+    "Protein",
     "HealthResponse"
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 """Schémas Pydantic pour validation"""
+from dataclasses import dataclass
 from pydantic import BaseModel, Field, validator
-from typing import List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Union
 from api.config import config
 
 class AnalysisRequest(BaseModel):
@@ -29,11 +30,51 @@ class AnalysisRequest(BaseModel):
         
         return v
 
-class CleavageSite(BaseModel):
-    """Site de clivage"""
+# Classes de motifs de clivage (entiers : comparaisons rapides en aval)
+MOTIF_SINGLE = 0    # R/K isolé (ou autre motif)
+MOTIF_DIBASIC = 1   # KK, KR, RR, RK
+MOTIF_RFAMIDE = 2   # X...RF / X...RY
+
+@dataclass(slots=True)
+class CleavageSite:
+    """Site de clivage (construit en masse depuis les regex : pas de validation)"""
     position: int
     motif: str
     index: int
+    motif_id: int = MOTIF_SINGLE  # Classe du motif, fixée par CleavageDetector
+
+@dataclass(slots=True)
+class Protein:
+    """
+    Protéine UniProt parsée (objet du cache de ProteinDatabase)
+    
+    Champs nommés comme les clés JSON de l'API ; to_dict() à la frontière HTTP
+    """
+    accession: str
+    geneName: str
+    proteinName: str
+    length: int
+    sequence: str
+    signalPeptideEnd: int
+    recommendedParams: Dict
+    fastaHeader: str
+    annotatedPeptides: Optional[List[Dict]] = None  # Seulement avec full_details
+    
+    def to_dict(self) -> Dict:
+        """Format JSON de l'API (annotatedPeptides omis si non demandé)"""
+        data = {
+            "accession": self.accession,
+            "geneName": self.geneName,
+            "proteinName": self.proteinName,
+            "length": self.length,
+            "sequence": self.sequence,
+            "signalPeptideEnd": self.signalPeptideEnd,
+            "recommendedParams": self.recommendedParams,
+            "fastaHeader": self.fastaHeader
+        }
+        if self.annotatedPeptides is not None:
+            data["annotatedPeptides"] = self.annotatedPeptides
+        return data
 
 class PTMResult(BaseModel):
     """PTM détectée"""
@@ -1,7 +1,6 @@
 """Routes API pour la recherche de protéines"""
 from fastapi import APIRouter, HTTPException, Query
 from typing import Literal
-import aiohttp
 
 from api.services.protein_db import protein_db
 
@@ -30,8 +29,7 @@ async def search_proteins(
         - /proteins/search?q=P01189&type=accession
     """
     
-    async with aiohttp.ClientSession() as session:
-        proteins = await protein_db.search_proteins(q, type, session, limit)
+    proteins = await protein_db.search_proteins(q, type, limit)
     
     if not proteins:
         return []
@@ -39,12 +37,12 @@ async def search_proteins(
     # Retourner format complet pour sélection
     return [
         {
-            "accession": p["accession"],
-            "geneName": p["geneName"],
-            "proteinName": p["proteinName"],
-            "length": p["length"],
-            "signalPeptideEnd": p["signalPeptideEnd"],
-            "fastaHeader": p["fastaHeader"]
+            "accession": p.accession,
+            "geneName": p.geneName,
+            "proteinName": p.proteinName,
+            "length": p.length,
+            "signalPeptideEnd": p.signalPeptideEnd,
+            "fastaHeader": p.fastaHeader
         }
         for p in proteins
     ]
@@ -54,8 +52,7 @@ async def search_proteins(
 async def get_protein(accession: str):
     """Récupère les détails complets d'une protéine"""
     
-    async with aiohttp.ClientSession() as session:
-        protein = await protein_db.get_protein(accession, session)
+    protein = await protein_db.get_protein(accession)
     
     if not protein:
         raise HTTPException(
@@ -63,4 +60,4 @@ async def get_protein(accession: str):
             detail=f"Protein {accession} not found or not secreted"
         )
     
-    return protein
\ No newline at end of file
+    return protein.to_dict()
\ No newline at end of file
@@ -21,7 +21,8 @@ class BatchAnalyzer:
         protein_id: str,
         mode: str,
         session: aiohttp.ClientSession,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        annotated_peptides: Optional[List[Dict]] = None
     ) -> Dict:
         """
         Analyse une seule protéine avec paramètres auto-recommandés
@@ -31,6 +32,7 @@ class BatchAnalyzer:
             mode: strict ou permissive
             session: Session aiohttp
             progress_callback: Fonction callback pour progression
+            annotated_peptides: Peptides annotés UniProt déjà récupérés (optionnel)
         
         Returns:
             Dictionnaire avec résultats ou erreur
@@ -39,7 +41,7 @@ class BatchAnalyzer:
             print(f"\n🔬 Starting analysis for: {protein_id}")
             
             # 1. Récupérer la protéine depuis UniProt
-            protein = await protein_db.get_protein(protein_id, session)
+            protein = await protein_db.get_protein(protein_id)
             
             if not protein:
                 return {
@@ -49,20 +51,15 @@ class BatchAnalyzer:
                 }
             
             # 2. Extraire infos
-            clean_seq = protein["sequence"]
-            gene_name = protein["geneName"]
-            protein_name = protein["proteinName"]
-            accession = protein["accession"]
+            clean_seq = protein.sequence
+            gene_name = protein.geneName
+            protein_name = protein.proteinName
+            accession = protein.accession
             
             protein_id_header = f"SP|{accession}|{gene_name}_HUMAN {protein_name}"
             
             # 3. Paramètres recommandés
-            recommended_params = protein.get("recommendedParams", {
-                "signalPeptideLength": 20,
-                "minCleavageSites": 4,
-                "minCleavageSpacing": 5,
-                "maxPeptideLength": 100
-            })
+            recommended_params = protein.recommendedParams
             
             signal_length = recommended_params["signalPeptideLength"]
             min_sites = recommended_params["minCleavageSites"]
@@ -116,7 +113,7 @@ class BatchAnalyzer:
                     "sequence": clean_seq,
                     "length": len(clean_seq),
                     "signalPeptideEnd": signal_length,
-                    "fastaHeader": protein["fastaHeader"],
+                    "fastaHeader": protein.fastaHeader,
                     "sequenceLength": len(clean_seq),
                     "cleavageSitesCount": len(cleavage_sites),
                     "peptides": [],
@@ -142,8 +139,8 @@ class BatchAnalyzer:
             # 9. Vérifier UniProt (parallèle)
             uniprot_results = await UniProtChecker.check_batch(
                 [p['sequence'] for p in peptides],
-                session,
-                protein_id=protein_id_header
+                protein_id=protein_id_header,
+                annotated_peptides=annotated_peptides
             )
             
             # 10. Assigner scores bioactivité
@@ -231,7 +228,7 @@ class BatchAnalyzer:
                 "sequence": clean_seq,
                 "length": len(clean_seq),
                 "signalPeptideEnd": signal_length,
-                "fastaHeader": protein["fastaHeader"],
+                "fastaHeader": protein.fastaHeader,
                 "sequenceLength": len(clean_seq),
                 "cleavageSitesCount": len(cleavage_sites),
                 "peptides": peptides,
@@ -291,10 +288,16 @@ class BatchAnalyzer:
         
         async with aiohttp.ClientSession() as session:
             # Vérifier d'abord quelles protéines existent
+            # (une requête UniProt groupée, puis une par ID non résolu)
             print("\n🔍 Step 1: Checking which proteins exist...")
+            found = await protein_db.get_proteins_bulk(unique_protein_ids, session)
             for protein_id in unique_protein_ids:
-                protein = await protein_db.get_protein(protein_id, session)
-                if not protein:
+                if protein_id in found:
+                    continue
+                protein = await protein_db.get_protein(protein_id)
+                if protein:
+                    found[protein_id] = protein
+                else:
                     not_found.append(protein_id)
                     print(f"❌ Protein not found: {protein_id}")
             
@@ -305,6 +308,11 @@ class BatchAnalyzer:
             if not_found:
                 print(f"❌ Not found: {', '.join(not_found)}")
             
+            # Peptides annotés UniProt de toutes les protéines, en parallèle
+            # (au lieu d'une requête à la suite de chaque analyse)
+            accessions = [found[pid].accession for pid in valid_protein_ids]
+            annotations = await UniProtChecker.check_many_proteins(accessions)
+            
             # Analyser séquentiellement
             print("\n🔬 Step 2: Analyzing proteins sequentially...")
             for idx, protein_id in enumerate(valid_protein_ids, 1):
@@ -317,7 +325,8 @@ class BatchAnalyzer:
                     protein_id=protein_id,
                     mode=mode,
                     session=session,
-                    progress_callback=None
+                    progress_callback=None,
+                    annotated_peptides=annotations.get(found[protein_id].accession)
                 )
                 
                 results.append(result)
@@ -1,9 +1,35 @@
 """Détection des sites de clivage PCSK1/3 et PCSK5/6/7"""
+import numpy as np
 import regex
 import re
+from functools import lru_cache
+from operator import attrgetter
 from typing import List
 from api.config import config
-from api.models.schemas import CleavageSite
+from api.models.schemas import CleavageSite, MOTIF_DIBASIC, MOTIF_RFAMIDE
+
+
+# Codes ASCII des résidus basiques (scan vectorisé du mode ultra-permissive)
+_K = ord('K')
+_R = ord('R')
+
+# Motifs RF-amide du mode ultra-permissive, compilés une seule fois
+_RFAMIDE_PATTERNS = (
+    (re.compile(r'RF(?:G)?'), 'RF'),    # RF ou RFG
+    (re.compile(r'RY(?:G)?'), 'RY')     # RY ou RYG
+)
+
+
+@lru_cache(maxsize=None)
+def _compiled(mode: str):
+    """Pattern regex compilé (une seule fois par mode)"""
+    return regex.compile(config.get_regex_pattern(mode))
+
+
+# Motif PCSK5/6/7 compilé au chargement avec le moteur `re` de la stdlib :
+# sur ce motif court sans lookaround, ~2x plus rapide que `regex`
+_PCSK567_RE = re.compile(config.get_regex_pattern("pcsk567"))
+
 
 class CleavageDetector:
     """Détecteur de sites de clivage"""
@@ -38,44 +64,44 @@ class CleavageDetector:
                 signal_length
             )
         
-        # ==================== STRICT / PERMISSIVE (INCHANGÉ) ====================
-        sites = []
+        # ==================== STRICT / PERMISSIVE ====================
+        # ⚠️ Strict : le scan part de signal_length sans découper la séquence,
+        # donc le lookbehind (?<!K|R) voit le résidu signal_length - 1. Un K/R
+        # à cette position supprime la paire dibasique qui suit (l'ancien
+        # découpage sequence[signal_length:] la rapportait comme site)
+        strict = mode == "strict"
+        positions = []
+        motifs = []
+        last_kept = -min_spacing  # Position (après motif) du dernier site retenu
         
         try:
-            # Récupérer le pattern
-            pattern = config.get_regex_pattern(mode)
-            
             # Chercher tous les sites après le peptide signal
-            search_region = sequence[signal_length:]
-            
-            for match in regex.finditer(pattern, search_region):
+            # (pos= évite de copier la région ; le lookbehind voit le vrai contexte)
+            for match in _compiled(mode).finditer(sequence, signal_length):
                 # Position absolue dans la séquence originale
-                absolute_position = signal_length + match.start()
+                absolute_position = match.start()
                 
                 # ⭐ DIFFÉRENCE ENTRE LES MODES
-                if mode == "strict":
-                    # Mode STRICT : Vérifier l'espacement minimum entre sites
-                    if len(sites) == 0 or (absolute_position - sites[-1].position >= min_spacing):
-                        site = CleavageSite(
-                            position=absolute_position + 2,  # Position après le motif
-                            motif=match.group(),
-                            index=absolute_position
-                        )
-                        sites.append(site)
-                else:
-                    # Mode PERMISSIVE : Accepter TOUS les sites détectés
-                    site = CleavageSite(
-                        position=absolute_position + 2,  # Position après le motif
-                        motif=match.group(),
-                        index=absolute_position
-                    )
-                    sites.append(site)
+                # STRICT : espacement minimum entre sites
+                # PERMISSIVE : accepter TOUS les sites détectés
+                if not strict or absolute_position - last_kept >= min_spacing:
+                    positions.append(absolute_position)
+                    motifs.append(match.group())
+                    last_kept = absolute_position + 2
         
         except regex.error as e:
             print(f"Erreur regex: {e}")
             return []
         
-        return sites
+        return [
+            CleavageSite(
+                position=position + 2,  # Position après le motif
+                motif=motif,
+                index=position,
+                motif_id=MOTIF_DIBASIC
+            )
+            for position, motif in zip(positions, motifs)
+        ]
     
     # ⭐ NOUVEAU : Détection PCSK5/6/7
     @staticmethod
@@ -98,14 +124,13 @@ class CleavageDetector:
         """
         sites = []
         
-        pattern = config.get_regex_pattern("pcsk567")  # R[A-Z](?:K|R)R
-        search_region = sequence[signal_length:]
+        pattern = _PCSK567_RE  # R[A-Z][KR]R
         
-        print(f"\n🔬 PCSK5/6/7 scan on {len(search_region)} aa (after signal peptide)")
-        print(f"   Pattern: {pattern}")
+        print(f"\n🔬 PCSK5/6/7 scan on {len(sequence) - signal_length} aa (after signal peptide)")
+        print(f"   Pattern: {pattern.pattern}")
         
-        for match in re.finditer(pattern, search_region):
-            absolute_position = signal_length + match.start()
+        for match in pattern.finditer(sequence, signal_length):
+            absolute_position = match.start()
             motif = match.group()
             
             # Le clivage se fait APRÈS le motif R-X-K/R-R
@@ -144,14 +169,9 @@ class CleavageDetector:
         
         # ==================== PRIORITÉ 1 : RF-AMIDE SCAN ====================
         # Chercher tous les RF, RFG, RY, RYG dans TOUTE la séquence
-        rfamide_patterns = [
-            (r'RF(?:G)?', 'RF'),    # RF ou RFG
-            (r'RY(?:G)?', 'RY')     # RY ou RYG
-        ]
-        
         rfamide_sites = []
-        for pattern, motif_base in rfamide_patterns:
-            for match in re.finditer(pattern, search_region):
+        for pattern, motif_base in _RFAMIDE_PATTERNS:
+            for match in pattern.finditer(search_region):
                 rf_start = match.start()
                 rf_end = match.end()
                 rf_motif = match.group()
@@ -196,24 +216,26 @@ class CleavageDetector:
         
         # ==================== PRIORITÉ 2 : TOUS LES R/K ====================
         # Détecter tous les R ou K isolés
+        # Positions des R/K en une passe NumPy sur les octets (1 octet par
+        # résidu : 'replace' garde les index alignés sur la séquence)
+        codes = np.frombuffer(search_region.encode('ascii', 'replace'), dtype=np.uint8)
+        basic_indexes = np.flatnonzero((codes == _K) | (codes == _R)).tolist()
+        
+        # Sites déjà pris par un RF-amide (test O(1))
+        rfamide_indexes = {s['index'] for s in rfamide_sites}
+        
         single_basic_count = 0
-        for i, aa in enumerate(search_region):
-            if aa in 'KR':
-                absolute_position = signal_length + i
-                
-                # Vérifier que ce n'est pas déjà un site RF-amide
-                is_rfamide = any(
-                    s['index'] == absolute_position 
-                    for s in rfamide_sites
-                )
-                
-                if not is_rfamide:
-                    sites.append(CleavageSite(
-                        position=absolute_position + 1,  # Après le R/K
-                        motif=aa,
-                        index=absolute_position
-                    ))
-                    single_basic_count += 1
+        for i in basic_indexes:
+            absolute_position = signal_length + i
+            
+            # Vérifier que ce n'est pas déjà un site RF-amide
+            if absolute_position not in rfamide_indexes:
+                sites.append(CleavageSite(
+                    position=absolute_position + 1,  # Après le R/K
+                    motif=search_region[i],
+                    index=absolute_position
+                ))
+                single_basic_count += 1
         
         print(f"🔵 Single basic sites found: {single_basic_count}")
         
@@ -222,11 +244,12 @@ class CleavageDetector:
             sites.append(CleavageSite(
                 position=rf_site['position'],
                 motif=rf_site['motif'],
-                index=rf_site['index']
+                index=rf_site['index'],
+                motif_id=MOTIF_RFAMIDE
             ))
         
         # Trier par position
-        sites.sort(key=lambda s: s.index)
+        sites.sort(key=attrgetter('index'))
         
         print(f"✅ Total ultra-permissive sites: {len(sites)} ({len(rfamide_sites)} RF-amide + {single_basic_count} single basic)")
         
@@ -2,6 +2,11 @@
 import re
 from typing import Dict, Optional
 
+# Patterns compilés une seule fois au chargement du module
+_HEADER_RE = re.compile(r'^(?:\w+\|)?([A-Z0-9]+)\|?([A-Z0-9_]+)?\s*(.*)?$')
+_AA_RE = re.compile(r'^[A-Z]+$')
+_NONAA_RE = re.compile(r'[^A-Z]')
+
 
 class FASTAParser:
     """Parser pour séquences FASTA"""
@@ -35,7 +40,7 @@ class FASTAParser:
                 
                 # Essayer d'extraire ID et nom du header
                 # Format type: >sp|P01308|INS_HUMAN Insulin
-                match = re.match(r'^(?:\w+\|)?([A-Z0-9]+)\|?([A-Z0-9_]+)?\s*(.*)?$', header)
+                match = _HEADER_RE.match(header)
                 if match:
                     protein_id = match.group(1) or match.group(2)
                     protein_name = match.group(3).strip() if match.group(3) else None
@@ -71,8 +76,8 @@ class FASTAParser:
             return False, "Empty sequence"
         
         # Vérifier que la séquence contient uniquement A-Z
-        if not re.match(r'^[A-Z]+$', sequence):
-            invalid_chars = set(re.findall(r'[^A-Z]', sequence))
+        if not _AA_RE.match(sequence):
+            invalid_chars = set(_NONAA_RE.findall(sequence))
             return False, f"Invalid characters found: {', '.join(sorted(invalid_chars))}"
         
         # Vérifier longueur minimale
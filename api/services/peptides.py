@@ -1,7 +1,184 @@
 """Extraction des peptides"""
-from typing import List, Dict
+import logging
+from functools import lru_cache
+from operator import attrgetter, itemgetter, sub
+from typing import List, Dict, Tuple
 from api.config import config
-from api.models.schemas import CleavageSite
+from api.models.schemas import CleavageSite, MOTIF_DIBASIC, MOTIF_RFAMIDE
+
+logger = logging.getLogger(__name__)
+
+# Motifs C-terminaux encodés en entiers pour le scoring de confiance
+TERMINAL_NONE = 0
+TERMINAL_G = 1
+TERMINAL_RFAMIDE = 2  # RF, RY, RFG, RYG
+
+_TERMINAL_IDS = {
+    'RF': TERMINAL_RFAMIDE,
+    'RY': TERMINAL_RFAMIDE,
+    'RFG': TERMINAL_RFAMIDE,
+    'RYG': TERMINAL_RFAMIDE,
+    'G': TERMINAL_G
+}
+
+# Tables de points indexées par classe (MOTIF_* / TERMINAL_*)
+_START_POINTS = (15, 50, 50)     # isolé, dibasique, RFamide
+_END_POINTS = (0, 0, 50)         # seul un site RFamide en C-term rapporte
+_TERMINAL_POINTS = (0, 15, 30)   # aucun, G, RF/RY(G)
+
+
+def _length_points(length: int) -> int:
+    """Points attribués selon la longueur du peptide"""
+    if 5 <= length <= 15:
+        return 20
+    elif 15 < length <= 30:
+        return 10
+    elif 30 < length <= 50:
+        return 5
+    elif length > 100:
+        return -30
+    return 0
+
+
+# Points de longueur précalculés pour 0..100 aa (au-delà : -30)
+_LENGTH_POINTS = tuple(_length_points(length) for length in range(101))
+
+
+_TERMINAL_3 = frozenset({'RFG', 'RYG'})
+_TERMINAL_2 = frozenset({'RF', 'RY'})
+
+
+@lru_cache(maxsize=256)
+def _terminal_motif(tail: str) -> str:
+    """
+    Détecte motif terminal spécial à partir des 3 derniers résidus
+    
+    Seuls les 3 derniers acides aminés comptent : le cache est indexé sur
+    cette queue (quelques dizaines de valeurs distinctes par protéine).
+    Les peptides font au moins 3 aa, la queue est donc toujours complète.
+    """
+    if tail in _TERMINAL_3:
+        return tail
+    
+    last_two = tail[-2:]
+    if last_two in _TERMINAL_2:
+        return last_two
+    elif tail[-1:] == 'G':
+        return 'G'
+    
+    return 'none'
+
+
+# Facteur de la clé de tri : supérieur à toute longueur de peptide candidat
+_RANK_SCALE = 1 << 16
+
+
+def _score_pairs(
+    indexes: List[int],
+    start_positions: List[int],
+    end_positions: List[int],
+    start_points: List[int],
+    end_points: List[int],
+    floors: List[int],
+    max_span: int,
+    min_confidence: int
+) -> List[Tuple[int, int, int, int, int]]:
+    """
+    Noyau du balayage ultra-permissif : entiers uniquement, aucun objet site
+    
+    Balayage à deux pointeurs : les index sont triés et end_pos >= index,
+    donc dès que index[j] dépasse start_pos + max_span plus aucun site j
+    suivant ne peut fermer un peptide assez court.
+    
+    Returns:
+        Liste de (rang, i, j, longueur, confiance) pour les paires retenues,
+        dans l'ordre (i, j) ; rang = clé de tri (confiance décroissante,
+        longueur croissante)
+    """
+    pairs = []
+    append_pair = pairs.append
+    length_points = _LENGTH_POINTS
+    n_sites = len(indexes)
+    
+    for i in range(n_sites):
+        start_pos = start_positions[i]
+        limit = start_pos + max_span
+        start_score = start_points[i]
+        start_floor = floors[i]
+        
+        for j in range(i + 1, n_sites):
+            if indexes[j] > limit:
+                break
+            
+            length = end_positions[j] - start_pos
+            if length > max_span or length < 3:
+                continue
+            
+            score = start_score + end_points[j] + length_points[length]
+            
+            # Plancher RFamide (90) puis plafond à 100
+            floor = start_floor if start_floor > floors[j] else floors[j]
+            if score < floor:
+                score = floor
+            elif score > 100:
+                score = 100
+            
+            if score >= min_confidence:
+                append_pair((length - score * _RANK_SCALE, i, j, length, score))
+    
+    return pairs
+
+
+# Gabarits des dicts peptide : dict.copy() recopie la table de clés d'un bloc,
+# plus rapide que de reconstruire un littéral de 10+ clés pour chaque peptide
+_PEPTIDE_TEMPLATE = {
+    'sequence': '',
+    'start': 0,
+    'end': 0,
+    'length': 0,
+    'inRange': False,
+    'cleavageMotifN': '',
+    'cleavageMotifC': '',
+    'cleavageMotif': '',
+    'bioactivityScore': 0.0,
+    'bioactivitySource': 'none'
+}
+
+_ULTRA_PEPTIDE_TEMPLATE = {
+    **_PEPTIDE_TEMPLATE,
+    'confidenceScore': 0,
+    'confidenceBadge': 'very_low'
+}
+
+
+def _make_peptide(
+    sequence: str,
+    start_pos: int,
+    end_pos: int,
+    motif_n: str,
+    motif_c: str,
+    optimal_min: int,
+    optimal_max: int
+) -> Dict:
+    """Dict peptide STRICT / PERMISSIVE entre deux positions (0-indexed, fin exclue)"""
+    length = end_pos - start_pos
+    
+    peptide = _PEPTIDE_TEMPLATE.copy()
+    peptide['sequence'] = sequence[start_pos:end_pos]
+    peptide['start'] = start_pos + 1  # 1-indexed
+    peptide['end'] = end_pos
+    peptide['length'] = length
+    peptide['inRange'] = optimal_min <= length <= optimal_max
+    peptide['cleavageMotifN'] = motif_n  # ⭐ NOUVEAU
+    peptide['cleavageMotifC'] = motif_c  # ⭐ NOUVEAU
+    peptide['cleavageMotif'] = motif_c   # Compatibilité
+    return peptide
+
+
+# Badge de confiance par tranche de 20 points (score 0-100) :
+# < 40 very_low, 40-59 low, 60-79 medium, >= 80 high
+_CONFIDENCE_BADGES = ("very_low", "very_low", "low", "medium", "high", "high")
+
 
 class PeptideExtractor:
     """Extracteur de peptides"""
@@ -26,90 +203,99 @@ class PeptideExtractor:
         PCSK567: Extrait forme mature après clivage R-X-K/R-R
         """
         
-        if mode == "ultra-permissive":
-            return PeptideExtractor._extract_ultra_permissive(
-                sequence,
-                cleavage_sites,
-                signal_length
-            )
-        
-        if mode == "pcsk567":
-            return PeptideExtractor._extract_pcsk567(
-                sequence,
-                cleavage_sites,
-                signal_length
-            )
+        specialized = _SPECIALIZED_EXTRACTORS.get(mode)
+        if specialized is not None:
+            return specialized(sequence, cleavage_sites, signal_length)
         
         # ==================== STRICT / PERMISSIVE ====================
         if len(cleavage_sites) < min_sites:
             return []
         
+        # Mode résolu une seule fois : chaque boucle spécialisée est sans branche de mode
+        if mode == "strict":
+            return PeptideExtractor._extract_strict(sequence, cleavage_sites, signal_length, min_spacing)
+        return PeptideExtractor._extract_permissive(sequence, cleavage_sites, signal_length)
+    
+    @staticmethod
+    def _extract_strict(
+        sequence: str,
+        cleavage_sites: List[CleavageSite],
+        signal_length: int,
+        min_spacing: int
+    ) -> List[Dict]:
+        """
+        Extraction STRICT : respecte l'espacement minimum, peptides > 3 aa
+        """
         peptides = []
         prev_position = signal_length
         prev_motif = "SIGNAL"  # ⭐ NOUVEAU : Motif N-terminal du premier peptide
         
+        optimal_min = config.OPTIMAL_PEPTIDE_MIN_LENGTH
+        optimal_max = config.OPTIMAL_PEPTIDE_MAX_LENGTH
+        append_peptide = peptides.append
+        
         for site in cleavage_sites:
             current_pos = site.index
-            distance = current_pos - prev_position
+            # Longueur calculée sur les positions : pas de découpe pour un rejet
+            pep_length = current_pos - prev_position
             
-            if mode == "strict":
-                if distance >= min_spacing:
-                    pep_seq = sequence[prev_position:current_pos]
-                    
-                    if len(pep_seq) > 3:
-                        peptides.append({
-                            'sequence': pep_seq,
-                            'start': prev_position + 1,  # 1-indexed
-                            'end': current_pos,
-                            'length': len(pep_seq),
-                            'inRange': config.OPTIMAL_PEPTIDE_MIN_LENGTH <= len(pep_seq) <= config.OPTIMAL_PEPTIDE_MAX_LENGTH,
-                            'cleavageMotifN': prev_motif,  # ⭐ NOUVEAU
-                            'cleavageMotifC': site.motif,  # ⭐ NOUVEAU
-                            'cleavageMotif': site.motif,   # Compatibilité
-                            'bioactivityScore': 0.0,
-                            'bioactivitySource': 'none'
-                        })
-                    
-                    prev_position = site.position
-                    prev_motif = site.motif  # ⭐ NOUVEAU : Mémoriser le motif pour le prochain peptide
-            else:
-                pep_seq = sequence[prev_position:current_pos]
-                
-                if len(pep_seq) > 0:
-                    peptides.append({
-                        'sequence': pep_seq,
-                        'start': prev_position + 1,  # 1-indexed
-                        'end': current_pos,
-                        'length': len(pep_seq),
-                        'inRange': config.OPTIMAL_PEPTIDE_MIN_LENGTH <= len(pep_seq) <= config.OPTIMAL_PEPTIDE_MAX_LENGTH,
-                        'cleavageMotifN': prev_motif,  # ⭐ NOUVEAU
-                        'cleavageMotifC': site.motif,  # ⭐ NOUVEAU
-                        'cleavageMotif': site.motif,   # Compatibilité
-                        'bioactivityScore': 0.0,
-                        'bioactivitySource': 'none'
-                    })
-                
-                prev_position = site.position
-                prev_motif = site.motif  # ⭐ NOUVEAU
+            # Site ignoré s'il est trop proche du précédent
+            if pep_length < min_spacing:
+                continue
+            
+            if pep_length > 3:
+                append_peptide(_make_peptide(
+                    sequence, prev_position, current_pos, prev_motif, site.motif,
+                    optimal_min, optimal_max
+                ))
+            
+            prev_position = site.position
+            prev_motif = site.motif  # ⭐ NOUVEAU : Mémoriser le motif pour le prochain peptide
         
         # Dernier peptide
-        if len(sequence) - prev_position > 0:
-            last_seq = sequence[prev_position:]
-            min_length = 3 if mode == "strict" else 0
+        if len(sequence) - prev_position > 3:
+            append_peptide(_make_peptide(
+                sequence, prev_position, len(sequence), prev_motif, 'END',
+                optimal_min, optimal_max
+            ))
+        
+        return peptides
+    
+    @staticmethod
+    def _extract_permissive(
+        sequence: str,
+        cleavage_sites: List[CleavageSite],
+        signal_length: int
+    ) -> List[Dict]:
+        """
+        Extraction PERMISSIVE : TOUS les peptides, même très courts
+        """
+        peptides = []
+        prev_position = signal_length
+        prev_motif = "SIGNAL"  # ⭐ NOUVEAU : Motif N-terminal du premier peptide
+        
+        optimal_min = config.OPTIMAL_PEPTIDE_MIN_LENGTH
+        optimal_max = config.OPTIMAL_PEPTIDE_MAX_LENGTH
+        append_peptide = peptides.append
+        
+        for site in cleavage_sites:
+            current_pos = site.index
             
-            if len(last_seq) > min_length:
-                peptides.append({
-                    'sequence': last_seq,
-                    'start': prev_position + 1,  # 1-indexed
-                    'end': len(sequence),
-                    'length': len(last_seq),
-                    'inRange': config.OPTIMAL_PEPTIDE_MIN_LENGTH <= len(last_seq) <= config.OPTIMAL_PEPTIDE_MAX_LENGTH,
-                    'cleavageMotifN': prev_motif,  # ⭐ NOUVEAU
-                    'cleavageMotifC': 'END',       # ⭐ NOUVEAU
-                    'cleavageMotif': 'END',        # Compatibilité
-                    'bioactivityScore': 0.0,
-                    'bioactivitySource': 'none'
-                })
+            if current_pos > prev_position:
+                append_peptide(_make_peptide(
+                    sequence, prev_position, current_pos, prev_motif, site.motif,
+                    optimal_min, optimal_max
+                ))
+            
+            prev_position = site.position
+            prev_motif = site.motif  # ⭐ NOUVEAU : Mémoriser le motif pour le prochain peptide
+        
+        # Dernier peptide
+        if len(sequence) > prev_position:
+            append_peptide(_make_peptide(
+                sequence, prev_position, len(sequence), prev_motif, 'END',
+                optimal_min, optimal_max
+            ))
         
         return peptides
     
@@ -133,12 +319,16 @@ class PeptideExtractor:
         """
         peptides = []
         
-        print(f"\n🧬 PCSK5/6/7 extraction from {len(cleavage_sites)} site(s)...")
+        logger.debug("🧬 PCSK5/6/7 extraction from %d site(s)...", len(cleavage_sites))
         
         if len(cleavage_sites) == 0:
-            print("   ❌ No cleavage sites found")
+            logger.debug("❌ No cleavage sites found")
             return []
         
+        pcsk_min = config.PCSK567_MIN_LENGTH
+        pcsk_max = config.PCSK567_MAX_LENGTH
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
         for i, site in enumerate(cleavage_sites):
             cleavage_pos = site.position  # Position après le motif R-X-K/R-R
             
@@ -151,7 +341,7 @@ class PeptideExtractor:
                     'start': cleavage_pos + 1,  # 1-indexed
                     'end': len(sequence),
                     'length': len(mature_seq),
-                    'inRange': config.PCSK567_MIN_LENGTH <= len(mature_seq) <= config.PCSK567_MAX_LENGTH,
+                    'inRange': pcsk_min <= len(mature_seq) <= pcsk_max,
                     'cleavageMotifN': site.motif,  # ⭐ NOUVEAU : Le motif PCSK5/6/7 est en N-term de la forme mature
                     'cleavageMotifC': 'END',       # ⭐ NOUVEAU : C'est la fin de la protéine
                     'cleavageMotif': site.motif,   # Compatibilité
@@ -161,10 +351,11 @@ class PeptideExtractor:
                     'cleavedBy': 'PCSK5/6/7'
                 })
                 
-                print(f"   ✅ Mature form: {len(mature_seq)} aa")
-                print(f"      N-term motif: {site.motif}")
-                print(f"      C-term motif: END")
-                print(f"      Sequence: {mature_seq[:50]}...")
+                if debug:
+                    logger.debug(
+                        "✅ Mature form: %d aa (N-term %s, C-term END) %s...",
+                        len(mature_seq), site.motif, mature_seq[:50]
+                    )
             
             # ==================== PRODOMAIN (avant clivage) ====================
             prodomain_start = signal_length
@@ -176,7 +367,7 @@ class PeptideExtractor:
                     'start': prodomain_start + 1,  # 1-indexed
                     'end': site.index,
                     'length': len(prodomain_seq),
-                    'inRange': config.PCSK567_MIN_LENGTH <= len(prodomain_seq) <= config.PCSK567_MAX_LENGTH,
+                    'inRange': pcsk_min <= len(prodomain_seq) <= pcsk_max,
                     'cleavageMotifN': 'SIGNAL',    # ⭐ NOUVEAU : Commence après le signal peptide
                     'cleavageMotifC': site.motif,  # ⭐ NOUVEAU : Se termine au site PCSK5/6/7
                     'cleavageMotif': site.motif,   # Compatibilité
@@ -186,11 +377,13 @@ class PeptideExtractor:
                     'cleavedBy': 'PCSK5/6/7'
                 })
                 
-                print(f"   📦 Prodomain: {len(prodomain_seq)} aa")
-                print(f"      N-term motif: SIGNAL")
-                print(f"      C-term motif: {site.motif}")
+                if debug:
+                    logger.debug(
+                        "📦 Prodomain: %d aa (N-term SIGNAL, C-term %s)",
+                        len(prodomain_seq), site.motif
+                    )
         
-        print(f"✅ PCSK5/6/7 extracted: {len(peptides)} peptide(s)")
+        logger.info("✅ PCSK5/6/7 extracted: %d peptide(s)", len(peptides))
         
         return peptides
     
@@ -204,212 +397,176 @@ class PeptideExtractor:
         Extraction ultra-permissive OPTIMISÉE
         
         ⭐ NOUVEAU : Capture motifs N et C terminal
-        """
-        peptides = []
         
+        Les paires retenues restent des tuples d'entiers jusqu'au filtrage
+        final : seuls les peptides renvoyés sont découpés et mis en dict.
+        """
         if len(cleavage_sites) == 0:
             return []
         
-        print(f"\n🧬 Ultra-permissive extraction from {len(cleavage_sites)} sites...")
+        logger.debug("🧬 Ultra-permissive extraction from %d sites...", len(cleavage_sites))
         
-        sorted_sites = sorted(cleavage_sites, key=lambda s: s.index)
+        sorted_sites = sorted(cleavage_sites, key=attrgetter('index'))
         
         MAX_DISTANCE = 100
         MAX_LENGTH = 50
         MIN_CONFIDENCE = 30
         
-        for i in range(len(sorted_sites)):
-            for j in range(i + 1, len(sorted_sites)):
-                site_start = sorted_sites[i]
-                site_end = sorted_sites[j]
-                
-                start_pos = site_start.position
-                
-                if 'RF' in site_end.motif or 'RY' in site_end.motif:
-                    end_pos = site_end.position
-                else:
-                    end_pos = site_end.index
-                
-                peptide_length = end_pos - start_pos
-                
-                if peptide_length > MAX_DISTANCE or peptide_length > MAX_LENGTH:
-                    continue
-                
-                if peptide_length < 3:
-                    continue
-                
-                peptide_seq = sequence[start_pos:end_pos]
-                
-                confidence = PeptideExtractor._calculate_confidence(
-                    peptide_seq,
-                    site_start,
-                    site_end,
-                    peptide_length
-                )
-                
-                if confidence < MIN_CONFIDENCE:
-                    continue
-                
-                peptides.append({
-                    'sequence': peptide_seq,
-                    'start': start_pos + 1,
-                    'end': end_pos,
-                    'length': peptide_length,
-                    'inRange': config.OPTIMAL_PEPTIDE_MIN_LENGTH <= peptide_length <= config.OPTIMAL_PEPTIDE_MAX_LENGTH,
-                    'cleavageMotifN': site_start.motif,  # ⭐ NOUVEAU
-                    'cleavageMotifC': site_end.motif,    # ⭐ NOUVEAU
-                    'cleavageMotif': PeptideExtractor._get_cleavage_label(site_start, site_end),  # Compatibilité
-                    'bioactivityScore': 0.0,
-                    'bioactivitySource': 'none',
-                    'confidenceScore': confidence,
-                    'confidenceBadge': PeptideExtractor._get_confidence_badge(confidence)
-                })
-        
-        peptides = PeptideExtractor._remove_overlapping_peptides(peptides)
+        # Bornes de config lues une fois (variables locales dans la boucle)
+        optimal_min = config.OPTIMAL_PEPTIDE_MIN_LENGTH
+        optimal_max = config.OPTIMAL_PEPTIDE_MAX_LENGTH
+        
+        # Positions précalculées par site : le RF/RY termine le peptide
+        # après le motif, les autres sites juste avant le R/K
+        indexes = [site.index for site in sorted_sites]
+        start_positions = [site.position for site in sorted_sites]
+        end_positions = [
+            site.position if site.motif_id == MOTIF_RFAMIDE else site.index
+            for site in sorted_sites
+        ]
+        
+        max_span = min(MAX_DISTANCE, MAX_LENGTH)
+        
+        # Sortie rapide : si aucun site n'a de voisin suivant à portée,
+        # aucune paire ne peut passer le filtre de longueur
+        if min(map(sub, indexes[1:], start_positions), default=max_span + 1) > max_span:
+            logger.debug("No site pair within %d aa", max_span)
+            return []
         
-        peptides.sort(key=lambda p: (
-            p.get('confidenceScore', 0),
-            -p['length']
-        ), reverse=True)
+        # Classes précalculées une seule fois par site (et non par paire) :
+        # points du site de début, points du site de fin + motif C-terminal
+        # (le peptide se termine toujours en end_pos), plancher RFamide
+        start_points = [_START_POINTS[site.motif_id] for site in sorted_sites]
+        end_points = [
+            _END_POINTS[site.motif_id]
+            + _TERMINAL_POINTS[_TERMINAL_IDS.get(_terminal_motif(sequence[end_pos - 3:end_pos]), TERMINAL_NONE)]
+            for site, end_pos in zip(sorted_sites, end_positions)
+        ]
+        floors = [90 if site.motif_id == MOTIF_RFAMIDE else 0 for site in sorted_sites]
+        
+        pairs = _score_pairs(
+            indexes,
+            start_positions,
+            end_positions,
+            start_points,
+            end_points,
+            floors,
+            max_span,
+            MIN_CONFIDENCE
+        )
         
         MAX_PEPTIDES = 50
-        if len(peptides) > MAX_PEPTIDES:
-            print(f"⚠️ Truncating from {len(peptides)} to top {MAX_PEPTIDES} peptides")
-            peptides = peptides[:MAX_PEPTIDES]
+        selected = PeptideExtractor._remove_overlapping_peptides(pairs, start_positions, MAX_PEPTIDES)
         
-        print(f"✅ Ultra-permissive extracted: {len(peptides)} peptides")
+        # Seules les paires sélectionnées sont découpées et mises en dict
+        peptides = []
+        for _, i, j, peptide_length, confidence in selected:
+            site_start = sorted_sites[i]
+            site_end = sorted_sites[j]
+            start_pos = start_positions[i]
+            
+            peptide = _ULTRA_PEPTIDE_TEMPLATE.copy()
+            peptide['sequence'] = sequence[start_pos:start_pos + peptide_length]
+            peptide['start'] = start_pos + 1
+            peptide['end'] = start_pos + peptide_length
+            peptide['length'] = peptide_length
+            peptide['inRange'] = optimal_min <= peptide_length <= optimal_max
+            peptide['cleavageMotifN'] = site_start.motif  # ⭐ NOUVEAU
+            peptide['cleavageMotifC'] = site_end.motif    # ⭐ NOUVEAU
+            peptide['cleavageMotif'] = PeptideExtractor._get_cleavage_label(site_start, site_end)  # Compatibilité
+            peptide['confidenceScore'] = confidence
+            peptide['confidenceBadge'] = PeptideExtractor._get_confidence_badge(confidence)
+            peptides.append(peptide)
+        
+        logger.info("✅ Ultra-permissive extracted: %d peptides", len(peptides))
         if len(peptides) > 0:
-            print(f"   Top confidence: {peptides[0].get('confidenceScore', 0)}")
-            print(f"   Top peptide: {peptides[0]['sequence'][:30]}...")
+            logger.debug(
+                "Top confidence: %s, top peptide: %s...",
+                peptides[0].get('confidenceScore', 0), peptides[0]['sequence'][:30]
+            )
         
         return peptides
     
     @staticmethod
-    def _remove_overlapping_peptides(peptides: List[Dict]) -> List[Dict]:
+    def _remove_overlapping_peptides(
+        pairs: List[Tuple[int, int, int, int, int]],
+        start_positions: List[int],
+        max_peptides: int
+    ) -> List[Tuple[int, int, int, int, int]]:
         """
         Élimine les peptides qui se chevauchent à plus de 70%
         Garde celui avec le meilleur score de confiance
-        """
-        if len(peptides) <= 1:
-            return peptides
-        
-        sorted_peptides = sorted(peptides, key=lambda p: p.get('confidenceScore', 0), reverse=True)
         
-        filtered = []
+        Filtre glouton et coupe top-N fusionnés : les paires sont parcourues
+        par tranche de confiance décroissante. Une fois une tranche terminée
+        avec max_peptides peptides gardés, les tranches suivantes seraient
+        toutes classées après : le parcours s'arrête là.
         
-        for peptide in sorted_peptides:
-            is_overlapping = False
+        Returns:
+            Les max_peptides meilleures paires (confiance décroissante,
+            longueur croissante)
+        """
+        # Tri stable : à confiance égale, l'ordre (i, j) du balayage est conservé
+        pairs.sort(key=itemgetter(4), reverse=True)
+        
+        kept = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        # Bornes des peptides gardés en tuples d'entiers pour la boucle interne
+        kept_spans = []
+        keep_pair = kept.append
+        keep_span = kept_spans.append
+        bucket_score = None
+        
+        for pair in pairs:
+            score = pair[4]
+            if score != bucket_score:
+                if len(kept) >= max_peptides:
+                    break
+                bucket_score = score
             
-            for kept_peptide in filtered:
-                overlap = PeptideExtractor._calculate_overlap(peptide, kept_peptide)
+            start = start_positions[pair[1]] + 1  # 1-indexed
+            length = pair[3] - 1                  # end - start
+            end = start + length
+            
+            for kept_start, kept_end, kept_length in kept_spans:
+                if end <= kept_start or kept_end <= start:
+                    continue
+                
+                min_length = length if length < kept_length else kept_length
+                if min_length <= 0:
+                    continue
+                
+                overlap_start = start if start > kept_start else kept_start
+                overlap_end = end if end < kept_end else kept_end
+                overlap = (overlap_end - overlap_start) / min_length
                 
                 if overlap > 0.7:
-                    is_overlapping = True
-                    print(f"   🚫 Removing overlapping: {peptide['sequence'][:20]}... (overlap {overlap:.0%})")
+                    if debug:
+                        logger.debug("🚫 Removing overlapping: %d-%d (overlap %.0f%%)", start, end, overlap * 100)
                     break
-            
-            if not is_overlapping:
-                filtered.append(peptide)
-        
-        print(f"   🔄 Removed {len(sorted_peptides) - len(filtered)} overlapping peptides")
-        return filtered
-    
-    @staticmethod
-    def _calculate_overlap(pep1: Dict, pep2: Dict) -> float:
-        """
-        Calcule le pourcentage de chevauchement entre deux peptides
-        Retourne 0.0 (aucun) à 1.0 (identique)
-        """
-        start1, end1 = pep1['start'], pep1['end']
-        start2, end2 = pep2['start'], pep2['end']
-        
-        if end1 <= start2 or end2 <= start1:
-            return 0.0
+            else:
+                keep_pair(pair)
+                keep_span((start, end, length))
         
-        overlap_start = max(start1, start2)
-        overlap_end = min(end1, end2)
-        overlap_length = overlap_end - overlap_start
+        # Tri final sur le rang ; à rang égal, (i, j) garde l'ordre du filtre
+        kept.sort()
         
-        min_length = min(end1 - start1, end2 - start2)
+        if len(kept) > max_peptides:
+            logger.debug("⚠️ Truncating from %d to top %d peptides", len(kept), max_peptides)
+            del kept[max_peptides:]
         
-        return overlap_length / min_length if min_length > 0 else 0.0
-    
-    @staticmethod
-    def _calculate_confidence(
-        peptide_seq: str,
-        site_start: CleavageSite,
-        site_end: CleavageSite,
-        length: int
-    ) -> int:
-        """
-        Calcule le score de confiance (0-100)
-        """
-        score = 0
-        
-        start_motif = site_start.motif
-        if '...' in start_motif:
-            score += 50
-        elif start_motif in ['KK', 'KR', 'RR', 'RK']:
-            score += 50
-        else:
-            score += 15
-        
-        end_motif = site_end.motif
-        if '...' in end_motif:
-            score += 50
-        
-        terminal_motif = PeptideExtractor._get_terminal_motif(peptide_seq)
-        if terminal_motif in ['RF', 'RY', 'RFG', 'RYG']:
-            score += 30
-            print(f"      🎯 Terminal RFamide: +30 pts")
-        elif terminal_motif == 'G':
-            score += 15
-        
-        if 5 <= length <= 15:
-            score += 20
-        elif 15 < length <= 30:
-            score += 10
-        elif 30 < length <= 50:
-            score += 5
-        elif length > 100:
-            score -= 30
-        
-        if '...' in start_motif or '...' in end_motif:
-            score = max(score, 90)
-            print(f"      🎯 RFamide bonus: minimum score 90")
-        
-        final_score = min(max(score, 0), 100)
-        
-        return final_score
-    
-    @staticmethod
-    def _get_terminal_motif(sequence: str) -> str:
-        """Détecte motif terminal spécial"""
-        if len(sequence) < 2:
-            return 'none'
-        
-        if len(sequence) >= 3:
-            last_three = sequence[-3:]
-            if last_three in ['RFG', 'RYG']:
-                return last_three
-        
-        last_two = sequence[-2:]
-        if last_two in ['RF', 'RY']:
-            return last_two
-        elif sequence[-1] == 'G':
-            return 'G'
-        
-        return 'none'
+        return kept
     
     @staticmethod
     def _get_cleavage_label(site_start: CleavageSite, site_end: CleavageSite) -> str:
         """Génère label pour le motif de clivage (compatibilité)"""
-        if '...' in site_start.motif:
+        # Classes déjà calculées par CleavageDetector (motif_id)
+        if site_start.motif_id == MOTIF_RFAMIDE:
             return site_start.motif
-        if '...' in site_end.motif:
+        if site_end.motif_id == MOTIF_RFAMIDE:
             return site_end.motif
         
-        if site_start.motif in ['KK', 'KR', 'RR', 'RK']:
+        if site_start.motif_id == MOTIF_DIBASIC:
             return site_start.motif
         
         return f"{site_start.motif}→{site_end.motif}"
@@ -417,11 +574,11 @@ class PeptideExtractor:
     @staticmethod
     def _get_confidence_badge(score: int) -> str:
         """Retourne le badge de confiance"""
-        if score >= 80:
-            return "high"
-        elif score >= 60:
-            return "medium"
-        elif score >= 40:
-            return "low"
-        else:
-            return "very_low"
\ No newline at end of file
+        return _CONFIDENCE_BADGES[min(score // 20, 5)]
+
+
+# Extracteurs spécialisés par mode (dispatch unique à l'entrée de extract)
+_SPECIALIZED_EXTRACTORS = {
+    "ultra-permissive": PeptideExtractor._extract_ultra_permissive,
+    "pcsk567": PeptideExtractor._extract_pcsk567
+}
@@ -1,52 +1,267 @@
 """Service de recherche et récupération de protéines depuis UniProt avec cache"""
 import aiohttp
 import asyncio
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import diskcache
+import logging
+import orjson
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import timedelta
 import re
+import threading
+from api.models.schemas import Protein
+
+logger = logging.getLogger(__name__)
+
+# Format d'accession UniProt, compilé une seule fois au chargement du module
+_UNIPROT_ID_RE = re.compile(r'^[OPQ][0-9][A-Z0-9]{3}[0-9]$|^[A-NR-Z][0-9]([A-Z][A-Z0-9]{2}[0-9]){1,2}$')
+
+# Recherche en TSV : colonnes plates, bien plus léger que le JSON avec features
+_SEARCH_TSV_FIELDS = "accession,gene_names,protein_name,length,sequence,ft_signal"
+_TSV_SIGNAL_END_RE = re.compile(r'SIGNAL\s+\S*?\.\.(\d+)')
+
+
+@lru_cache(maxsize=2048)
+def _recommended_params(length: int, signal_end: int, num_peptides: int) -> Dict:
+    """
+    Paramètres recommandés, mémoïsés (fonction pure de trois entiers)
+    
+    ⚠️ Le même dict est partagé entre les appels : ne passer que par
+    calculate_recommended_params, qui en renvoie une copie
+    """
+    signal_peptide_length = signal_end
+    
+    estimated_sites = num_peptides * 1.5
+    
+    if estimated_sites > 12:
+        min_cleavage_sites = 5
+    elif estimated_sites > 8:
+        min_cleavage_sites = 4
+    elif estimated_sites > 5:
+        min_cleavage_sites = 3
+    else:
+        min_cleavage_sites = 2
+    
+    if length < 150:
+        min_cleavage_spacing = 3
+    elif length < 300:
+        min_cleavage_spacing = 4
+    else:
+        min_cleavage_spacing = 5
+    
+    max_peptide_length = 100
+    
+    return {
+        "signalPeptideLength": signal_peptide_length,
+        "minCleavageSites": min_cleavage_sites,
+        "minCleavageSpacing": min_cleavage_spacing,
+        "maxPeptideLength": max_peptide_length
+    }
+
 
 class ProteinDatabase:
     """
     Gestionnaire de protéines sécrétées humaines
     - Recherche par gene name ou UniProt ID
-    - Cache 24h pour performance
+    - Cache LRU 24h (borné) pour performance, doublé d'un cache disque
     - Calcul automatique des paramètres recommandés
     """
     
     BASE_URL = "https://rest.uniprot.org/uniprotkb"
     CACHE_DURATION = timedelta(hours=24)
+    CACHE_MAX_ENTRIES = 1024
+    DISK_CACHE_DIR = "/tmp/uniprot_cache"  # Partagé entre workers et redémarrages
+    DISK_CACHE_SIZE_LIMIT = 256 << 20  # 256 Mo
+    # Préfixe des clés disque : à incrémenter quand le type des valeurs
+    # change (v2 : protein_{id} contient un Protein, plus un dict)
+    DISK_CACHE_SCHEMA = 2
+    BULK_CHUNK_SIZE = 50  # Accessions par requête /search groupée
     
     def __init__(self):
-        self.cache: Dict[str, Dict] = {}
+        # clé -> (expiration monotonic, données), du moins au plus récemment utilisé
+        self.cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._cache_ttl = self.CACHE_DURATION.total_seconds()
+        # Second niveau sur disque (SQLite) : survit aux redémarrages,
+        # ouvert à la première utilisation (pas d'I/O à l'import)
+        self._disk: Optional[diskcache.Cache] = None
+        self._disk_lock = threading.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        # clé de cache -> appel UniProt en cours
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Session aiohttp partagée (créée à la première utilisation)
+        
+        Les connexions TCP/TLS vers UniProt restent ouvertes entre les requêtes
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=20,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+        return self._session
+    
+    async def close(self):
+        """Ferme la session partagée et le cache disque (arrêt de l'application)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
+    
+    def _get_disk(self) -> diskcache.Cache:
+        """Cache disque (ouvert à la première utilisation, depuis un thread)"""
+        with self._disk_lock:
+            if self._disk is None:
+                self._disk = diskcache.Cache(self.DISK_CACHE_DIR, size_limit=self.DISK_CACHE_SIZE_LIMIT)
+            return self._disk
+    
+    def _disk_key(self, key: str) -> str:
+        """Clé disque versionnée (les entrées d'un ancien schéma sont ignorées)"""
+        return f"v{self.DISK_CACHE_SCHEMA}:{key}"
+    
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable]):
+        """
+        Un seul appel en cours par clé : les appelants concurrents attendent
+        le même résultat au lieu de relancer la requête UniProt
+        
+        `fetch` ne doit capturer aucune ressource propre à un appelant (ex :
+        sa ClientSession) : si cet appelant est annulé et la ferme, la tâche
+        partagée échouerait pour tous les autres. cached_fetch passe donc
+        toujours la session mutualisée de get_session().
+        
+        Pas de verrou : lecture et enregistrement dans _inflight ne contiennent
+        aucun await, donc aucune autre coroutine ne s'intercale (une seule
+        boucle asyncio).
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            
+            def _done(finished: asyncio.Future):
+                if self._inflight.get(key) is finished:
+                    del self._inflight[key]
+            
+            task.add_done_callback(_done)
+        
+        # shield : l'annulation d'un appelant n'annule pas l'appel partagé
+        return await asyncio.shield(task)
+    
+    async def cached_fetch(
+        self,
+        key: str,
+        fetch: Callable[[aiohttp.ClientSession], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """
+        Lecture du cache, sinon un seul appel `fetch(session)` partagé par clé
+        
+        `fetch` reçoit la session mutualisée et retourne None en cas d'échec
+        (rien n'est mis en cache) ; tout autre résultat, même une liste vide,
+        est mis en cache sous `key`.
+        
+        Args:
+            key: Clé de cache (ex: "protein_P01189")
+            fetch: Appel UniProt à faire si la clé est absente du cache
+        
+        Returns:
+            Donnée en cache ou résultat de `fetch`
+        """
+        cached = await self._get_cache(key)
+        if cached is not None:
+            return cached
+        
+        async def fetch_and_store():
+            # Un appel identique a pu se terminer pendant la lecture disque
+            cached = self._get_memory(key)
+            if cached is not None:
+                return cached
+            result = await fetch(await self.get_session())
+            if result is not None:
+                await self._set_cache(key, result)
+            return result
+        
+        return await self._single_flight(key, fetch_and_store)
     
     def _is_uniprot_id(self, query: str) -> bool:
         """Détecte si la query est un UniProt ID (format: P01189)"""
-        return bool(re.match(r'^[OPQ][0-9][A-Z0-9]{3}[0-9]$|^[A-NR-Z][0-9]([A-Z][A-Z0-9]{2}[0-9]){1,2}$', query.upper()))
+        # fullmatch : "$" seul accepterait un retour à la ligne final
+        return bool(_UNIPROT_ID_RE.fullmatch(query.upper()))
+    
+    async def _get_cache(self, key: str) -> Optional[Dict]:
+        """Récupère du cache si valide (<24h) : mémoire d'abord, puis disque"""
+        data = self._get_memory(key)
+        if data is not None:
+            return data
+        
+        # Cache disque (rempli par un autre worker ou avant un redémarrage),
+        # lu hors de la boucle asyncio. Simple optimisation : une erreur
+        # disque (lecture seule, plein, verrou SQLite...) compte comme un miss
+        try:
+            data, expire_time = await asyncio.to_thread(
+                lambda: self._get_disk().get(self._disk_key(key), default=None, expire_time=True)
+            )
+        except Exception as e:
+            logger.warning("⚠️ Disk cache read failed for %s: %s", key, e)
+            return None
+        if data is None:
+            return None
+        
+        # Remonter en mémoire pour le temps de vie restant
+        remaining = expire_time - time.time() if expire_time else self._cache_ttl
+        self._remember(key, data, remaining)
+        logger.debug("✅ Disk cache HIT: %s", key)
+        return data
     
-    def _get_cache(self, key: str) -> Optional[Dict]:
-        """Récupère du cache si valide (<24h)"""
-        if key in self.cache:
-            cached = self.cache[key]
-            if datetime.now() - cached['timestamp'] < self.CACHE_DURATION:
-                print(f"✅ Cache HIT: {key}")
-                return cached['data']
+    def _get_memory(self, key: str) -> Optional[Dict]:
+        """Cache mémoire seul (sans I/O)"""
+        entry = self.cache.get(key)
+        if entry is not None:
+            expires_at, data = entry
+            if time.monotonic() < expires_at:
+                self.cache.move_to_end(key)
+                logger.debug("✅ Cache HIT: %s", key)
+                return data
+            # Entrée expirée : libérée dès qu'on la croise
+            del self.cache[key]
         return None
     
-    def _set_cache(self, key: str, data: Dict):
-        """Stocke en cache"""
-        self.cache[key] = {
-            'data': data,
-            'timestamp': datetime.now()
-        }
-        print(f"💾 Cache SET: {key}")
+    async def _set_cache(self, key: str, data: Dict):
+        """Stocke en cache mémoire (LRU) et sur disque (hors de la boucle asyncio)"""
+        self._remember(key, data, self._cache_ttl)
+        # Échec d'écriture disque : l'entrée mémoire suffit
+        try:
+            await asyncio.to_thread(
+                lambda: self._get_disk().set(self._disk_key(key), data, expire=self._cache_ttl)
+            )
+        except Exception as e:
+            logger.warning("⚠️ Disk cache write failed for %s: %s", key, e)
+        
+        logger.debug("💾 Cache SET: %s", key)
+    
+    def _remember(self, key: str, data: Dict, ttl: float):
+        """Cache mémoire (évince les entrées les moins récemment utilisées)"""
+        self.cache[key] = (time.monotonic() + ttl, data)
+        self.cache.move_to_end(key)
+        
+        while len(self.cache) > self.CACHE_MAX_ENTRIES:
+            self.cache.popitem(last=False)
     
     async def search_proteins(
         self,
         query: str,
         search_type: str,
-        limit: int,
-        session: aiohttp.ClientSession
-    ) -> List[Dict]:
+        limit: int
+    ) -> List[Protein]:
         """
         Recherche de protéines sécrétées humaines par gene name ou ID
         
@@ -54,7 +269,6 @@ class ProteinDatabase:
             query: Gene name (ex: "POMC") ou UniProt ID (ex: "P01189")
             search_type: "gene_name" ou "accession"
             limit: Nombre max de résultats
-            session: Session aiohttp
         
         Returns:
             Liste de protéines matchant la requête
@@ -62,12 +276,23 @@ class ProteinDatabase:
         
         cache_key = f"search_{search_type}_{query.lower()}"
         
-        # Check cache
-        cached = self._get_cache(cache_key)
-        if cached:
-            return cached
+        # Cache, sinon un seul appel pour les requêtes identiques concurrentes
+        proteins = await self.cached_fetch(
+            cache_key,
+            lambda session: self._fetch_search(query, search_type, limit, session)
+        )
+        return proteins if proteins is not None else []
+    
+    async def _fetch_search(
+        self,
+        query: str,
+        search_type: str,
+        limit: int,
+        session: aiohttp.ClientSession
+    ) -> Optional[List[Protein]]:
+        """Appel UniProt de search_proteins (cache manquant, None si échec)"""
         
-        print(f"\n🔍 Searching proteins for: {query} (type: {search_type})")
+        logger.debug("🔍 Searching proteins for: %s (type: %s)", query, search_type)
         
         # Construire la query UniProt
         if search_type == "accession":
@@ -77,14 +302,14 @@ class ProteinDatabase:
         
         uniprot_query += " AND (organism_id:9606) AND (reviewed:true) AND (cc_subcellular_location:Secreted)"
         
-        print(f"📝 UniProt query: {uniprot_query}")
+        logger.debug("📝 UniProt query: %s", uniprot_query)
         
         url = f"{self.BASE_URL}/search"
         params = {
             "query": uniprot_query,
-            "format": "json",
+            "format": "tsv",
             "size": limit,
-            "fields": "accession,gene_names,protein_name,sequence,length,ft_signal,ft_peptide,ft_propep"
+            "fields": _SEARCH_TSV_FIELDS
         }
         
         try:
@@ -94,67 +319,60 @@ class ProteinDatabase:
                 timeout=aiohttp.ClientTimeout(total=15)
             ) as response:
                 
-                print(f"📡 UniProt response status: {response.status}")
+                logger.debug("📡 UniProt response status: %d", response.status)
                 
                 if response.status != 200:
                     error_text = await response.text()
-                    print(f"❌ UniProt error {response.status}: {error_text[:200]}")
-                    return []
+                    logger.warning("❌ UniProt error %d: %s", response.status, error_text[:200])
+                    return None
                 
-                data = await response.json()
-                results = data.get("results", [])
+                # TSV : une ligne par entrée, sans les features imbriquées du JSON
+                text = await response.text()
+                rows = text.splitlines()[1:]  # Sauter l'en-tête
                 
-                print(f"✅ Found {len(results)} proteins")
+                logger.info("✅ Found %d proteins", len(rows))
                 
                 # Parser les résultats
                 proteins = []
-                for entry in results:
-                    # ✅ Vérifier que c'est bien un dict
-                    if isinstance(entry, dict):
-                        protein = self._parse_protein_entry(entry)
-                        if protein:
-                            proteins.append(protein)
-                    else:
-                        print(f"⚠️ Skipping non-dict entry: {type(entry)}")
-                
-                # Cache les résultats
-                self._set_cache(cache_key, proteins)
+                for line in rows:
+                    protein = self._parse_tsv_row(line.split('\t'))
+                    if protein:
+                        proteins.append(protein)
                 
                 return proteins
         
         except asyncio.TimeoutError:
-            print(f"⏱️ Timeout searching proteins")
-            return []
+            logger.warning("⏱️ Timeout searching proteins")
+            return None
         except Exception as e:
-            print(f"❌ Error searching proteins: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            # Traceback seulement en DEBUG (pas de gros volume pendant une panne UniProt)
+            logger.error("❌ Error searching proteins: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return None
     
-    async def get_protein(
-        self,
-        accession: str,
-        session: aiohttp.ClientSession
-    ) -> Optional[Dict]:
+    async def get_protein(self, accession: str) -> Optional[Protein]:
         """
         Récupère les détails complets d'une protéine
         
         Args:
             accession: UniProt ID (ex: "P01189")
-            session: Session aiohttp
         
         Returns:
             Protéine complète avec paramètres recommandés
         """
         
-        cache_key = f"protein_{accession}"
-        
-        # Check cache
-        cached = self._get_cache(cache_key)
-        if cached:
-            return cached
+        return await self.cached_fetch(
+            f"protein_{accession}",
+            lambda session: self._fetch_protein(accession, session)
+        )
+    
+    async def _fetch_protein(
+        self,
+        accession: str,
+        session: aiohttp.ClientSession
+    ) -> Optional[Protein]:
+        """Appel UniProt de get_protein (cache manquant)"""
         
-        print(f"\n🔍 Fetching protein: {accession}")
+        logger.debug("🔍 Fetching protein: %s", accession)
         
         url = f"{self.BASE_URL}/{accession}"
         params = {
@@ -170,26 +388,109 @@ class ProteinDatabase:
             ) as response:
                 
                 if response.status != 200:
-                    print(f"❌ Protein not found: {accession}")
+                    logger.info("❌ Protein not found: %s", accession)
                     return None
                 
-                entry = await response.json()
-                protein = self._parse_protein_entry(entry, full_details=True)
-                
-                if protein:
-                    # Cache le résultat
-                    self._set_cache(cache_key, protein)
-                
-                return protein
+                entry = orjson.loads(await response.read())
+                return self._parse_protein_entry(entry, full_details=True)
         
         except asyncio.TimeoutError:
-            print(f"⏱️ Timeout fetching protein")
+            logger.warning("⏱️ Timeout fetching protein")
             return None
         except Exception as e:
-            print(f"❌ Error fetching protein: {e}")
+            logger.error("❌ Error fetching protein: %s", e)
             return None
     
-    def _parse_protein_entry(self, entry: Dict, full_details: bool = False) -> Optional[Dict]:
+    async def get_proteins_bulk(
+        self,
+        accessions: List[str],
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Dict[str, Protein]:
+        """
+        Récupère plusieurs protéines en une requête UniProt par lot de 50
+        
+        Les protéines trouvées sont mises en cache comme par get_protein.
+        Une accession absente du résultat (ID secondaire, ID inconnu...) est
+        simplement omise : l'appelant peut se rabattre sur get_protein.
+        Seuls les IDs au format UniProt entrent dans la requête groupée ; les
+        autres sont omis aussi (jamais insérés tels quels dans la query).
+        
+        Args:
+            accessions: UniProt IDs (ex: ["P01189", "P01308"])
+            session: Session aiohttp (par défaut : session partagée)
+        
+        Returns:
+            Dict accession demandée -> protéine complète
+        """
+        found = {}
+        missing = []
+        
+        for accession in dict.fromkeys(accessions):
+            cached = await self._get_cache(f"protein_{accession}")
+            if cached:
+                found[accession] = cached
+            elif self._is_uniprot_id(accession):
+                missing.append(accession)
+        
+        if not missing:
+            return found
+        
+        if session is None:
+            session = await self.get_session()
+        
+        url = f"{self.BASE_URL}/search"
+        
+        for chunk_start in range(0, len(missing), self.BULK_CHUNK_SIZE):
+            chunk = missing[chunk_start:chunk_start + self.BULK_CHUNK_SIZE]
+            requested = {accession.upper(): accession for accession in chunk}
+            
+            logger.debug("🔍 Fetching %d proteins in one request", len(chunk))
+            
+            params = {
+                "query": " OR ".join(f"accession:{accession}" for accession in chunk),
+                "format": "json",
+                "size": len(chunk),
+                "fields": "accession,gene_names,protein_name,sequence,length,ft_signal,ft_peptide,ft_propep"
+            }
+            
+            try:
+                async with session.get(
+                    url,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=15)
+                ) as response:
+                    
+                    if response.status != 200:
+                        logger.warning("❌ UniProt bulk error %d", response.status)
+                        continue
+                    
+                    data = orjson.loads(await response.read())
+            
+            except asyncio.TimeoutError:
+                logger.warning("⏱️ Timeout fetching proteins")
+                continue
+            except Exception as e:
+                logger.error("❌ Error fetching proteins: %s", e)
+                continue
+            
+            for entry in data.get("results", []):
+                if not isinstance(entry, dict):
+                    continue
+                
+                protein = self._parse_protein_entry(entry, full_details=True)
+                if not protein:
+                    continue
+                
+                accession = requested.get(protein.accession.upper())
+                if accession is None:
+                    continue
+                
+                await self._set_cache(f"protein_{accession}", protein)
+                found[accession] = protein
+        
+        return found
+    
+    def _parse_protein_entry(self, entry: Dict, full_details: bool = False) -> Optional[Protein]:
         """Parse une entrée UniProt en format standardisé"""
         
         try:
@@ -253,28 +554,70 @@ class ProteinDatabase:
             # Header FASTA
             fasta_header = f">sp|{accession}|{gene_name or 'UNKN'}_HUMAN {protein_name}"
             
-            protein = {
-                "accession": accession,
-                "geneName": gene_name or "Unknown",
-                "proteinName": protein_name,
-                "length": length,
-                "sequence": sequence,
-                "signalPeptideEnd": signal_end,
-                "recommendedParams": recommended_params,
-                "fastaHeader": fasta_header
-            }
-            
-            if full_details:
-                protein["annotatedPeptides"] = annotated_peptides
-            
-            return protein
+            return Protein(
+                accession=accession,
+                geneName=gene_name or "Unknown",
+                proteinName=protein_name,
+                length=length,
+                sequence=sequence,
+                signalPeptideEnd=signal_end,
+                recommendedParams=recommended_params,
+                fastaHeader=fasta_header,
+                annotatedPeptides=annotated_peptides if full_details else None
+            )
         
         except Exception as e:
-            print(f"❌ Error parsing protein entry: {e}")
-            import traceback
-            traceback.print_exc()
+            # Traceback seulement en DEBUG (pas de gros volume pendant une panne UniProt)
+            logger.error("❌ Error parsing protein entry: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return None
     
+    def _parse_tsv_row(self, cols: List[str]) -> Optional[Protein]:
+        """
+        Parse une ligne TSV de /search (colonnes de _SEARCH_TSV_FIELDS)
+        
+        Même format que _parse_protein_entry sans full_details
+        
+        ⚠️ Le nom vient de la colonne "Protein names", où les noms alternatifs
+        suivent le nom recommandé entre parenthèses : un nom recommandé qui
+        contient lui-même " (" est tronqué à cet endroit. Acceptable pour une
+        liste de résultats ; get_protein (JSON) donne le nom exact.
+        """
+        if len(cols) < 6:
+            return None
+        
+        accession, gene_names, protein_names, length, sequence, signal = cols[:6]
+        
+        if not accession or not sequence:
+            return None
+        
+        # Gene name : le nom principal vient en premier, les synonymes ensuite
+        gene_name = gene_names.split(' ', 1)[0] or None
+        
+        # Protein name : le nom recommandé précède les noms alternatifs "(...)"
+        # et les chaînes clivées "[Cleaved into: ...]" (heuristique, voir plus haut)
+        protein_name = protein_names.split(' [', 1)[0].split(' (', 1)[0] or "Unknown protein"
+        
+        length = int(length) if length.isdigit() else len(sequence)
+        
+        # Signal peptide : "SIGNAL 1..24; /evidence=..."
+        match = _TSV_SIGNAL_END_RE.search(signal)
+        signal_end = int(match.group(1)) if match else 20
+        
+        return Protein(
+            accession=accession,
+            geneName=gene_name or "Unknown",
+            proteinName=protein_name,
+            length=length,
+            sequence=sequence,
+            signalPeptideEnd=signal_end,
+            recommendedParams=self.calculate_recommended_params(
+                length=length,
+                signal_end=signal_end,
+                num_peptides=0
+            ),
+            fastaHeader=f">sp|{accession}|{gene_name or 'UNKN'}_HUMAN {protein_name}"
+        )
+    
     @staticmethod
     def calculate_recommended_params(
         length: int,
@@ -282,35 +625,8 @@ class ProteinDatabase:
         num_peptides: int
     ) -> Dict:
         """Calcule les paramètres recommandés pour une protéine"""
-        
-        signal_peptide_length = signal_end
-        
-        estimated_sites = num_peptides * 1.5
-        
-        if estimated_sites > 12:
-            min_cleavage_sites = 5
-        elif estimated_sites > 8:
-            min_cleavage_sites = 4
-        elif estimated_sites > 5:
-            min_cleavage_sites = 3
-        else:
-            min_cleavage_sites = 2
-        
-        if length < 150:
-            min_cleavage_spacing = 3
-        elif length < 300:
-            min_cleavage_spacing = 4
-        else:
-            min_cleavage_spacing = 5
-        
-        max_peptide_length = 100
-        
-        return {
-            "signalPeptideLength": signal_peptide_length,
-            "minCleavageSites": min_cleavage_sites,
-            "minCleavageSpacing": min_cleavage_spacing,
-            "maxPeptideLength": max_peptide_length
-        }
+        # Copie : le dict mémoïsé ne doit pas être modifié par l'appelant
+        return dict(_recommended_params(length, signal_end, num_peptides))
 
 
 # Instance globale
@@ -1,6 +1,77 @@
 """Service de détection des modifications post-traductionnelles (PTMs)"""
-import re
-from typing import List, Dict, Optional
+import copy
+import logging
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Motifs d'amidation selon les résidus qui suivent le peptide :
+# dibasique d'abord, puis R/K seul
+_AMIDATION_DIBASIC = {'RR': 'GRR', 'RK': 'GRK', 'KR': 'GKR', 'KK': 'GKK'}
+_AMIDATION_MONOBASIC = {'R': 'GR', 'K': 'GK'}
+
+# Résultat PTM complet par motif (construit une fois, copié à chaque détection)
+_AMIDATION_RESULTS = {
+    motif: {
+        'type': 'C-terminal amidation',
+        'shortName': 'C-amidation',
+        'emoji': '🔵',
+        'enzyme': 'PAM',
+        'motif': motif,
+        'position': 'C-terminus',
+        'description': f'{motif} → -NH₂',
+        'removes_g': True
+    }
+    for motif in (*_AMIDATION_DIBASIC.values(), *_AMIDATION_MONOBASIC.values())
+}
+
+# Pyroglutamate selon le premier résidu (Q → QPCT, E → QPCTL)
+_PGLU_BY_FIRST = {
+    aa: {
+        'type': 'N-terminal pyroglutamate',
+        'shortName': 'N-pGlu',
+        'emoji': '🟢',
+        'enzyme': enzyme,
+        'residue': aa,
+        'position': 1,
+        'description': f'{aa} → pGlu'
+    }
+    for aa, enzyme in (('Q', 'QPCT'), ('E', 'QPCTL'))
+}
+
+_GHRELIN_RESULT = {
+    'type': 'Ghrelin acylation',
+    'shortName': 'Ghrelin-acyl',
+    'emoji': '🟣',
+    'enzyme': 'GOAT (MBOAT4)',
+    'residue': 'Ser3',
+    'position': 3,
+    'description': 'Ser3 octanoylation'
+}
+
+# Champs fixes des PTMs positionnelles : seuls position/motif/description
+# sont ajoutés à chaque détection
+_DISULFIDE_TEMPLATE = {
+    'type': 'Disulfide bonds',
+    'shortName': 'Disulfide',
+    'emoji': '🔴',
+    'enzyme': 'PDI / ER oxidoreductases'
+}
+
+_SULFATION_TEMPLATE = {
+    'type': 'Tyrosine O-sulfation',
+    'shortName': 'Y-sulfation',
+    'emoji': '🟡',
+    'enzyme': 'TPST1/TPST2'
+}
+
+_GLYCO_TEMPLATE = {
+    'type': 'N-glycosylation',
+    'shortName': 'N-glyco',
+    'emoji': '🟠',
+    'enzyme': 'Oligosaccharyltransferase'
+}
 
 
 class PTMDetector:
@@ -35,14 +106,28 @@ class PTMDetector:
         Returns:
             Liste de PTMs détectées avec détails
         """
+        # Seuls les 3 résidus après le peptide comptent pour l'amidation :
+        # clé de cache courte même pour une très longue protéine
+        after_peptide = ''
+        if (
+            full_protein_sequence
+            and isinstance(peptide_end, int)
+            and peptide_sequence
+            and peptide_sequence.endswith('G')
+        ):
+            after_peptide = full_protein_sequence[peptide_end:peptide_end + 3]
+        
+        # Copie profonde (listes 'positions' incluses) : le résultat en cache
+        # n'est jamais exposé
+        return copy.deepcopy(list(_detect_all_cached(peptide_sequence, after_peptide)))
+    
+    @staticmethod
+    def _detect_all(peptide_sequence: str, after_peptide: str) -> List[Dict]:
+        """Détection complète (after_peptide : résidus qui suivent un peptide en G)"""
         ptms = []
         
         # 1. C-terminal amidation (besoin du contexte après le peptide)
-        c_amid = PTMDetector.detect_c_terminal_amidation(
-            peptide_sequence,
-            full_protein_sequence,
-            peptide_end
-        )
+        c_amid = _amidation_from_context(after_peptide)
         if c_amid:
             ptms.append(c_amid)
         
@@ -118,30 +203,7 @@ class PTMDetector:
         # Extraire les résidus après le peptide (max 3 aa)
         after_peptide = full_protein_sequence[after_peptide_idx:after_peptide_idx + 3]
         
-        # Patterns : [RK]{1,2}
-        patterns = [
-            (r'^RR', 'GRR'),
-            (r'^RK', 'GRK'),
-            (r'^KR', 'GKR'),
-            (r'^KK', 'GKK'),
-            (r'^R', 'GR'),
-            (r'^K', 'GK'),
-        ]
-        
-        for pattern, motif in patterns:
-            if re.match(pattern, after_peptide):
-                return {
-                    'type': 'C-terminal amidation',
-                    'shortName': 'C-amidation',
-                    'emoji': '🔵',
-                    'enzyme': 'PAM',
-                    'motif': motif,
-                    'position': 'C-terminus',
-                    'description': f'{motif} → -NH₂',
-                    'removes_g': True
-                }
-        
-        return None
+        return _amidation_from_context(after_peptide)
     
     @staticmethod
     def detect_n_terminal_pyroglu(sequence: str) -> Optional[Dict]:
@@ -150,32 +212,9 @@ class PTMDetector:
         Motif : Q ou E au N-terminus
         Enzyme : QPCT (Q) ou QPCTL (E)
         """
-        if not sequence:
-            return None
-        
-        first_aa = sequence[0]
-        
-        if first_aa == 'Q':
-            return {
-                'type': 'N-terminal pyroglutamate',
-                'shortName': 'N-pGlu',
-                'emoji': '🟢',
-                'enzyme': 'QPCT',
-                'residue': 'Q',
-                'position': 1,
-                'description': 'Q → pGlu'
-            }
-        elif first_aa == 'E':
-            return {
-                'type': 'N-terminal pyroglutamate',
-                'shortName': 'N-pGlu',
-                'emoji': '🟢',
-                'enzyme': 'QPCTL',
-                'residue': 'E',
-                'position': 1,
-                'description': 'E → pGlu'
-            }
-        return None
+        # Lookup sur le premier résidu ('' pour une séquence vide → None)
+        pglu = _PGLU_BY_FIRST.get(sequence[:1])
+        return pglu.copy() if pglu else None
     
     @staticmethod
     def detect_disulfide_bonds(sequence: str) -> Optional[Dict]:
@@ -184,19 +223,25 @@ class PTMDetector:
         Motif : 2+ Cystéines (C)
         Enzyme : PDI, ER oxidoreductases
         """
-        cys_positions = [i + 1 for i, aa in enumerate(sequence) if aa == 'C']
-        
-        if len(cys_positions) >= 2:
-            return {
-                'type': 'Disulfide bonds',
-                'shortName': 'Disulfide',
-                'emoji': '🔴',
-                'enzyme': 'PDI / ER oxidoreductases',
-                'positions': cys_positions,
-                'count': len(cys_positions) // 2,
-                'description': f'{len(cys_positions)} Cys (≥{len(cys_positions)//2} bonds)'
-            }
-        return None
+        # Comptage en C d'abord : 0 ou 1 Cys (cas le plus fréquent) → rien à faire
+        n_cys = sequence.count('C')
+        if n_cys < 2:
+            return None
+        
+        # Saut direct d'une C à la suivante (str.find en C) plutôt qu'un
+        # parcours Python de tous les résidus
+        cys_positions = []
+        i = sequence.find('C')
+        while i >= 0:
+            cys_positions.append(i + 1)
+            i = sequence.find('C', i + 1)
+        
+        return {
+            **_DISULFIDE_TEMPLATE,
+            'positions': cys_positions,
+            'count': n_cys // 2,
+            'description': f'{n_cys} Cys (≥{n_cys // 2} bonds)'
+        }
     
     @staticmethod
     def detect_ghrelin_acylation(sequence: str) -> Optional[Dict]:
@@ -206,15 +251,7 @@ class PTMDetector:
         Enzyme : GOAT (MBOAT4)
         """
         if sequence.startswith('GSSF'):
-            return {
-                'type': 'Ghrelin acylation',
-                'shortName': 'Ghrelin-acyl',
-                'emoji': '🟣',
-                'enzyme': 'GOAT (MBOAT4)',
-                'residue': 'Ser3',
-                'position': 3,
-                'description': 'Ser3 octanoylation'
-            }
+            return _GHRELIN_RESULT.copy()
         return None
     
     @staticmethod
@@ -224,29 +261,33 @@ class PTMDetector:
         Motif : Y dans contexte acide (D/E dans ±5aa)
         Enzyme : TPST1/TPST2
         """
+        # Moins de 2 D/E dans toute la séquence → aucune fenêtre ne peut
+        # atteindre le seuil : inutile de parcourir les Y
+        if sequence.count('D') + sequence.count('E') < 2:
+            return []
+        
         sulfations = []
         
-        for i, aa in enumerate(sequence):
-            if aa == 'Y':
-                # Extraire fenêtre ±5 résidus
-                start = max(0, i - 5)
-                end = min(len(sequence), i + 6)
-                window = sequence[start:end]
-                
-                # Compter résidus acides
-                acidic_count = window.count('D') + window.count('E')
-                
-                # Au moins 2 résidus acides dans la fenêtre
-                if acidic_count >= 2:
-                    sulfations.append({
-                        'type': 'Tyrosine O-sulfation',
-                        'shortName': 'Y-sulfation',
-                        'emoji': '🟡',
-                        'enzyme': 'TPST1/TPST2',
-                        'residue': f'Y{i + 1}',
-                        'position': i + 1,
-                        'description': f'Y{i + 1} → Y(SO₃)'
-                    })
+        # Saut direct d'une Y à la suivante (str.find en C) : aucun travail
+        # sur les autres résidus
+        i = sequence.find('Y')
+        while i >= 0:
+            # Extraire fenêtre ±5 résidus
+            window = sequence[max(0, i - 5):i + 6]
+            
+            # Compter résidus acides
+            acidic_count = window.count('D') + window.count('E')
+            
+            # Au moins 2 résidus acides dans la fenêtre
+            if acidic_count >= 2:
+                sulfations.append({
+                    **_SULFATION_TEMPLATE,
+                    'residue': f'Y{i + 1}',
+                    'position': i + 1,
+                    'description': f'Y{i + 1} → Y(SO₃)'
+                })
+            
+            i = sequence.find('Y', i + 1)
         
         return sulfations
     
@@ -259,22 +300,24 @@ class PTMDetector:
         """
         glycosylations = []
         
-        # Pattern : N-X-[ST] où X n'est pas P
-        pattern = r'N[^P][ST]'
-        
-        for match in re.finditer(pattern, sequence):
-            start_pos = match.start()
-            motif = match.group()
+        # Motif : N-X-[ST] où X n'est pas P
+        # Saut d'une N à la suivante (str.find) ; après un motif trouvé on
+        # repart après le triplet (motifs non chevauchants, comme finditer)
+        last = len(sequence) - 2
+        start_pos = sequence.find('N')
+        while 0 <= start_pos < last:
+            if sequence[start_pos + 1] == 'P' or sequence[start_pos + 2] not in 'ST':
+                start_pos = sequence.find('N', start_pos + 1)
+                continue
+            motif = sequence[start_pos:start_pos + 3]
             
             glycosylations.append({
-                'type': 'N-glycosylation',
-                'shortName': 'N-glyco',
-                'emoji': '🟠',
-                'enzyme': 'Oligosaccharyltransferase',
+                **_GLYCO_TEMPLATE,
                 'motif': motif,
                 'position': start_pos + 1,
                 'description': f'N{start_pos + 1} glycosylation'
             })
+            start_pos = sequence.find('N', start_pos + 3)
         
         return glycosylations
     
@@ -297,87 +340,108 @@ class PTMDetector:
         if not isinstance(sequence, str):
             return str(sequence)
         
-        modified = list(sequence)
-        
         # ⭐ ÉTAPE 1 : Vérifier si C-terminal amidation et enlever le G
         has_c_amidation = any(
             ptm.get('type') == 'C-terminal amidation' and ptm.get('removes_g', False)
             for ptm in ptms
         )
         
-        if has_c_amidation and modified and modified[-1] == 'G':
-            modified = modified[:-1]
-            print(f"🔵 C-amidation: G terminal enlevé → séquence devient {''.join(modified)}")
-        
-        # ⭐ ÉTAPE 2 : Trier les PTMs par position (pour ordre d'application)
-        sorted_ptms = sorted(
-            [p for p in ptms if isinstance(p.get('position'), int)],
-            key=lambda x: x.get('position', 0)
-        )
+        core = sequence
+        if has_c_amidation and core.endswith('G'):
+            core = core[:-1]
+            logger.debug("🔵 C-amidation: G terminal enlevé → séquence devient %s", core)
         
-        # ⭐ ÉTAPE 3 : Appliquer les modifications avec tracking d'offset
-        # Tracker les cystéines déjà modifiées pour disulfide bonds
-        modified_cys_indices = set()
+        # ⭐ ÉTAPE 2 : Remplacements position (0-indexed) -> notation PTM
+        # Un résidu absent de `repl` est inchangé ; les suffixes (-NH₂) à part
+        n = len(core)
+        repl = {}
+        suffix = []
         
         for ptm in ptms:
             ptm_type = ptm.get('type', '')
             
             if ptm_type == 'C-terminal amidation':
                 # Ajouter -NH₂ au C-terminus (le G a déjà été enlevé)
-                modified.append('-NH₂')
-                print(f"🔵 C-amidation: -NH₂ ajouté")
+                suffix.append('-NH₂')
+                logger.debug("🔵 C-amidation: -NH₂ ajouté")
             
             elif ptm_type == 'N-terminal pyroglutamate':
                 # Remplacer Q ou E par pGlu
-                if len(modified) > 0:
-                    old_aa = modified[0]
-                    modified[0] = 'pGlu'
-                    print(f"🟢 N-pGlu: {old_aa} → pGlu au N-terminus")
+                if n > 0:
+                    old_aa = repl.get(0, core[0])
+                    repl[0] = 'pGlu'
+                    logger.debug("🟢 N-pGlu: %s → pGlu au N-terminus", old_aa)
             
             elif ptm_type == 'Ghrelin acylation':
                 # Ajouter octanoyl sur G au début
-                if len(modified) > 0 and modified[0] == 'G':
-                    modified[0] = 'G(C8:0)'
-                    print(f"🟣 Ghrelin: G → G(C8:0)")
+                if n > 0 and repl.get(0, core[0]) == 'G':
+                    repl[0] = 'G(C8:0)'
+                    logger.debug("🟣 Ghrelin: G → G(C8:0)")
             
             elif ptm_type == 'Disulfide bonds':
                 # Numéroter toutes les cystéines
                 positions = ptm.get('positions', [])
-                print(f"🔴 Disulfide: Numérotation de {len(positions)} cystéines aux positions {positions}")
+                logger.debug("🔴 Disulfide: Numérotation de %d cystéines aux positions %s", len(positions), positions)
                 
+                # Les cystéines déjà numérotées sont dans `repl`
                 cys_found = 0
-                for i, aa in enumerate(modified):
-                    if aa == 'C' and i not in modified_cys_indices:
+                i = core.find('C')
+                while i >= 0:
+                    if i not in repl:
                         cys_found += 1
-                        modified[i] = f'C{cys_found}'
-                        modified_cys_indices.add(i)
+                        repl[i] = f'C{cys_found}'
                         if cys_found >= len(positions):
                             break
+                    i = core.find('C', i + 1)
             
             elif ptm_type == 'Tyrosine O-sulfation':
                 # Trouver la position de la tyrosine
                 pos = ptm.get('position', 0) - 1  # Convertir en 0-indexed
                 
-                if 0 <= pos < len(modified):
-                    # Vérifier si c'est bien une Y
-                    if modified[pos] == 'Y':
-                        modified[pos] = 'Y(SO₃)'
-                        print(f"🟡 Y-sulfation: Y{pos+1} → Y(SO₃)")
+                # Vérifier si c'est bien une Y
+                if 0 <= pos < n and repl.get(pos, core[pos]) == 'Y':
+                    repl[pos] = 'Y(SO₃)'
+                    logger.debug("🟡 Y-sulfation: Y%d → Y(SO₃)", pos + 1)
             
             elif ptm_type == 'N-glycosylation':
                 # Trouver la position de l'asparagine
                 pos = ptm.get('position', 0) - 1  # Convertir en 0-indexed
                 
-                if 0 <= pos < len(modified):
-                    # Vérifier si c'est bien une N
-                    if modified[pos] == 'N':
-                        modified[pos] = 'N(GlcNAc)'
-                        print(f"🟠 N-glyco: N{pos+1} → N(GlcNAc)")
-        
-        result = ''.join(modified)
-        print(f"✅ Séquence finale modifiée : {result}")
+                # Vérifier si c'est bien une N
+                if 0 <= pos < n and repl.get(pos, core[pos]) == 'N':
+                    repl[pos] = 'N(GlcNAc)'
+                    logger.debug("🟠 N-glyco: N%d → N(GlcNAc)", pos + 1)
+        
+        # ⭐ ÉTAPE 3 : Assemblage par tranches entre les positions modifiées
+        # (les résidus inchangés sont copiés en C, pas un par un)
+        parts = []
+        prev = 0
+        for pos in sorted(repl):
+            parts.append(core[prev:pos])
+            parts.append(repl[pos])
+            prev = pos + 1
+        parts.append(core[prev:])
+        parts.extend(suffix)
+        
+        result = ''.join(parts)
+        logger.debug("✅ Séquence finale modifiée : %s", result)
         return result
 
 
+def _amidation_from_context(after_peptide: str) -> Optional[Dict]:
+    """Amidation selon les résidus qui suivent le peptide (déjà terminé par G)"""
+    # Motifs : [RK]{1,2} (recherche directe, sans regex)
+    motif = _AMIDATION_DIBASIC.get(after_peptide[:2]) or _AMIDATION_MONOBASIC.get(after_peptide[:1])
+    if motif:
+        return _AMIDATION_RESULTS[motif].copy()
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _detect_all_cached(peptide_sequence: str, after_peptide: str) -> Tuple[Dict, ...]:
+    """PTMs mémoïsées par (peptide, contexte C-terminal) : résultat pur et déterministe"""
+    return tuple(PTMDetector._detect_all(peptide_sequence, after_peptide))
+
+
 # Instance globale
 ptm_detector = PTMDetector()
\ No newline at end of file
@@ -1,28 +1,67 @@
 """Vérification des peptides connus dans UniProt - Version 3 statuts"""
 import aiohttp
 import asyncio
+import logging
+import orjson
 from typing import Dict, Optional, List
+from api.services.protein_db import protein_db
+
+logger = logging.getLogger(__name__)
 
 class UniProtChecker:
     """Vérificateur de peptides connus dans UniProt"""
     
     BASE_URL = "https://rest.uniprot.org/uniprotkb"
+    MAX_CONCURRENT_FETCHES = 10
+    
+    # Plafond de requêtes UniProt simultanées (partagé par tous les appels),
+    # créé à la première utilisation dans la boucle asyncio courante
+    _fetch_slots: Optional[asyncio.Semaphore] = None
+    _fetch_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @classmethod
+    def _get_fetch_slots(cls) -> asyncio.Semaphore:
+        """Sémaphore de la boucle courante (recréé si la boucle a changé)"""
+        loop = asyncio.get_running_loop()
+        if cls._fetch_slots is None or cls._fetch_slots_loop is not loop:
+            cls._fetch_slots = asyncio.Semaphore(cls.MAX_CONCURRENT_FETCHES)
+            cls._fetch_slots_loop = loop
+        return cls._fetch_slots
     
     @staticmethod
-    async def get_protein_features(
-        protein_id: str,
-        session: aiohttp.ClientSession
-    ) -> List[Dict]:
-        """Récupère tous les peptides annotés d'une protéine"""
-        
-        print(f"\n🔍 Récupération features pour protéine : {protein_id}")
+    async def get_protein_features(protein_id: str) -> List[Dict]:
+        """
+        Récupère tous les peptides annotés d'une protéine
         
+        Réutilise le cache UniProt de protein_db (mémoire + disque, 24h) ;
+        les appels concurrents pour une même protéine partagent une requête
+        """
+        features = await UniProtChecker._load_protein_features(protein_id)
+        return features if features is not None else []
+    
+    @staticmethod
+    async def _load_protein_features(protein_id: str) -> Optional[List[Dict]]:
+        """get_protein_features, mais None si la requête UniProt a échoué"""
         # Nettoyer l'ID (enlever le prefix sp|tr| si présent)
         clean_id = protein_id
         if '|' in clean_id:
             parts = clean_id.split('|')
             clean_id = parts[1] if len(parts) > 1 else parts[0]
         
+        return await protein_db.cached_fetch(
+            f"features_{clean_id}",
+            lambda session: UniProtChecker._fetch_protein_features(clean_id, session)
+        )
+    
+    @staticmethod
+    async def _fetch_protein_features(
+        clean_id: str,
+        session: aiohttp.ClientSession
+    ) -> Optional[List[Dict]]:
+        """Appel UniProt de get_protein_features (cache manquant, None si échec)"""
+        
+        logger.debug("🔍 Récupération features pour protéine : %s", clean_id)
+        
         url = f"{UniProtChecker.BASE_URL}/{clean_id}"
         
         params = {
@@ -31,28 +70,28 @@ class UniProtChecker:
         }
         
         try:
-            async with session.get(
+            async with UniProtChecker._get_fetch_slots(), session.get(
                 url,
                 params=params,
                 timeout=aiohttp.ClientTimeout(total=15)
             ) as response:
                 
-                print(f"✅ Status code : {response.status}")
+                logger.debug("✅ Status code : %d", response.status)
                 
                 if response.status != 200:
-                    print(f"❌ Erreur HTTP {response.status}")
-                    return []
+                    logger.warning("❌ Erreur HTTP %d", response.status)
+                    return None
                 
-                data = await response.json()
+                data = orjson.loads(await response.read())
                 
                 # Récupérer la séquence complète de la protéine
                 full_sequence = data.get("sequence", {}).get("value", "")
                 
                 if not full_sequence:
-                    print(f"❌ Pas de séquence trouvée")
-                    return []
+                    logger.warning("❌ Pas de séquence trouvée pour %s", clean_id)
+                    return None
                 
-                print(f"📊 Séquence protéine : {len(full_sequence)} aa")
+                logger.debug("📊 Séquence protéine : %d aa", len(full_sequence))
                 
                 # Extraire les features
                 features = data.get("features", [])
@@ -82,25 +121,44 @@ class UniProtChecker:
                 # ⭐ FIX β-MSH : Trier par longueur (plus court = plus spécifique)
                 peptide_features.sort(key=lambda p: p['length'])
                 
-                print(f"✅ {len(peptide_features)} peptides annotés trouvés")
+                logger.debug("✅ %d peptides annotés trouvés", len(peptide_features))
+                
+                # Réponse valide (même sans peptide annoté) : mise en cache
                 return peptide_features
         
         except asyncio.TimeoutError:
-            print(f"⏱️ Timeout UniProt")
-            return []
+            logger.warning("⏱️ Timeout UniProt pour %s", clean_id)
+            return None
         except Exception as e:
-            print(f"❌ Erreur UniProt: {e}")
-            return []
+            logger.error("❌ Erreur UniProt: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return None
+    
+    @staticmethod
+    def build_exact_index(annotated_peptides: List[Dict]) -> Dict[str, Dict]:
+        """
+        Index séquence -> peptide annoté pour les matchs exacts en O(1)
+        
+        À séquence égale, le premier annoté (le plus court) est gardé
+        """
+        index = {}
+        for annotated in annotated_peptides:
+            index.setdefault(annotated["sequence"], annotated)
+        return index
     
     @staticmethod
     def find_matching_peptide(
         peptide_seq: str,
-        annotated_peptides: List[Dict]
+        annotated_peptides: List[Dict],
+        exact_index: Optional[Dict[str, Dict]] = None
     ) -> Optional[Dict]:
         """
         Cherche un match avec 3 niveaux de précision
         ⭐ AVEC FIX β-MSH : Priorité aux peptides plus courts (plus spécifiques)
         
+        Args:
+            exact_index: Index de build_exact_index (construit ici si absent,
+                à passer pour un batch pour ne le construire qu'une fois)
+        
         Returns:
             {
                 "match_type": "exact" | "partial" | None,
@@ -112,26 +170,28 @@ class UniProtChecker:
         # ⭐ Les peptides sont déjà triés par longueur (plus court d'abord)
         # Donc on prend le PREMIER match trouvé (le plus spécifique)
         
-        for annotated in annotated_peptides:
-            annotated_seq = annotated["sequence"]
-            
-            # 1. EXACT MATCH ✅
-            if peptide_seq == annotated_seq:
-                print(f"✅ EXACT MATCH : {annotated['description']}")
-                return {
-                    "match_type": "exact",
-                    "description": annotated['description'],
-                    "note": None
-                }
+        if exact_index is None:
+            exact_index = UniProtChecker.build_exact_index(annotated_peptides)
+        
+        # 1. EXACT MATCH ✅ (lookup dans l'index)
+        annotated = exact_index.get(peptide_seq)
+        if annotated is not None:
+            logger.debug("✅ EXACT MATCH : %s", annotated['description'])
+            return {
+                "match_type": "exact",
+                "description": annotated['description'],
+                "note": None
+            }
         
         # 2. PARTIAL MATCHES (seulement si pas d'exact match)
         for annotated in annotated_peptides:
             annotated_seq = annotated["sequence"]
             
             # 2a. Fragment (peptide détecté DANS peptide annoté) ⚠️
-            if peptide_seq in annotated_seq:
+            # (une seule recherche : find donne aussi la position)
+            start_pos = annotated_seq.find(peptide_seq)
+            if start_pos >= 0:
                 # Déterminer quelle partie du peptide annoté
-                start_pos = annotated_seq.index(peptide_seq)
                 end_pos = start_pos + len(peptide_seq)
                 
                 if start_pos == 0:
@@ -141,7 +201,7 @@ class UniProtChecker:
                 else:
                     fragment_type = "Internal fragment"
                 
-                print(f"⚠️ PARTIAL MATCH (fragment) : {fragment_type} of {annotated['description']}")
+                logger.debug("⚠️ PARTIAL MATCH (fragment) : %s of %s", fragment_type, annotated['description'])
                 
                 return {
                     "match_type": "partial",
@@ -151,7 +211,7 @@ class UniProtChecker:
             
             # 2b. Extension (peptide annoté DANS peptide détecté) ⚠️
             if annotated_seq in peptide_seq:
-                print(f"⚠️ PARTIAL MATCH (extension) : Extended form of {annotated['description']}")
+                logger.debug("⚠️ PARTIAL MATCH (extension) : Extended form of %s", annotated['description'])
                 
                 return {
                     "match_type": "partial",
@@ -161,16 +221,38 @@ class UniProtChecker:
         
         return None
     
+    @classmethod
+    async def check_many_proteins(cls, protein_ids: List[str]) -> Dict[str, Optional[List[Dict]]]:
+        """
+        Récupère les peptides annotés de plusieurs protéines en parallèle
+        
+        Les requêtes partent ensemble (asyncio.gather), au plus
+        MAX_CONCURRENT_FETCHES à la fois
+        
+        Returns:
+            Dict protein_id -> peptides annotés (None si échec : check_batch
+            refera alors la requête pour cette protéine)
+        """
+        unique_ids = list(dict.fromkeys(protein_ids))
+        features = await asyncio.gather(
+            *(cls._load_protein_features(protein_id) for protein_id in unique_ids)
+        )
+        return dict(zip(unique_ids, features))
+    
     @classmethod
     async def check_batch(
         cls,
         peptides: List[str],
-        session: aiohttp.ClientSession,
-        protein_id: Optional[str] = None
+        protein_id: Optional[str] = None,
+        annotated_peptides: Optional[List[Dict]] = None
     ) -> List[Dict]:
         """
         Vérifie un batch de peptides contre les annotations UniProt
         
+        Args:
+            annotated_peptides: Peptides annotés déjà récupérés
+                (check_many_proteins) ; si None, une requête UniProt
+        
         Returns:
             Liste de dictionnaires avec :
             - uniprotStatus: "exact" | "partial" | "unknown"
@@ -179,13 +261,13 @@ class UniProtChecker:
             - uniprotAccession: Accession UniProt
         """
         
-        print(f"\n🚀 Début vérification UniProt pour {len(peptides)} peptides...")
+        logger.debug("🚀 Début vérification UniProt pour %d peptides...", len(peptides))
         
         results = []
         
         # Si pas d'ID protéine fourni, impossible de vérifier
         if not protein_id or protein_id == "N/A":
-            print(f"⚠️ Pas d'ID protéine fourni - skip vérification UniProt")
+            logger.debug("⚠️ Pas d'ID protéine fourni - skip vérification UniProt")
             return [
                 {
                     "uniprotStatus": "unknown",
@@ -197,10 +279,12 @@ class UniProtChecker:
             ]
         
         # Récupérer tous les peptides annotés de la protéine (1 seule requête)
-        annotated_peptides = await cls.get_protein_features(protein_id, session)
+        # (sauf s'ils ont déjà été récupérés, ex: check_many_proteins)
+        if annotated_peptides is None:
+            annotated_peptides = await cls.get_protein_features(protein_id)
         
         if not annotated_peptides:
-            print(f"⚠️ Aucun peptide annoté trouvé pour {protein_id}")
+            logger.debug("⚠️ Aucun peptide annoté trouvé pour %s", protein_id)
             return [
                 {
                     "uniprotStatus": "unknown",
@@ -217,11 +301,14 @@ class UniProtChecker:
             parts = clean_accession.split('|')
             clean_accession = parts[1] if len(parts) > 1 else parts[0]
         
+        # Index des matchs exacts, construit une fois pour tout le batch
+        exact_index = cls.build_exact_index(annotated_peptides)
+        
         # Comparer chaque peptide détecté avec les peptides annotés
         for i, peptide_seq in enumerate(peptides, 1):
-            print(f"\n--- Peptide {i}/{len(peptides)} : {peptide_seq[:30]}... ---")
+            logger.debug("--- Peptide %d/%d : %.30s... ---", i, len(peptides), peptide_seq)
             
-            match = cls.find_matching_peptide(peptide_seq, annotated_peptides)
+            match = cls.find_matching_peptide(peptide_seq, annotated_peptides, exact_index)
             
             if match:
                 results.append({
@@ -231,7 +318,7 @@ class UniProtChecker:
                     "uniprotAccession": clean_accession
                 })
             else:
-                print(f"❌ Aucun match trouvé")
+                logger.debug("❌ Aucun match trouvé")
                 results.append({
                     "uniprotStatus": "unknown",
                     "uniprotName": None,
@@ -239,13 +326,14 @@ class UniProtChecker:
                     "uniprotAccession": None
                 })
         
-        exact_count = sum(1 for r in results if r['uniprotStatus'] == 'exact')
-        partial_count = sum(1 for r in results if r['uniprotStatus'] == 'partial')
-        unknown_count = sum(1 for r in results if r['uniprotStatus'] == 'unknown')
-        
-        print(f"\n✅ Vérification terminée :")
-        print(f"   - {exact_count} exact matches")
-        print(f"   - {partial_count} partial matches")
-        print(f"   - {unknown_count} unknown")
+        # Comptages uniquement si le récapitulatif sera affiché
+        if logger.isEnabledFor(logging.DEBUG):
+            exact_count = sum(1 for r in results if r['uniprotStatus'] == 'exact')
+            partial_count = sum(1 for r in results if r['uniprotStatus'] == 'partial')
+            unknown_count = sum(1 for r in results if r['uniprotStatus'] == 'unknown')
+            logger.debug(
+                "✅ Vérification terminée : %d exact, %d partial, %d unknown",
+                exact_count, partial_count, unknown_count
+            )
         
         return results
\ No newline at end of file
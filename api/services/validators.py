@@ -2,6 +2,12 @@
 from fastapi import HTTPException
 from api.config import config
 
+# Blancs supprimés par clean_sequence (une seule passe str.translate)
+_WHITESPACE_TABLE = str.maketrans('', '', '\n \r')
+
+# Acides aminés valides en octets : bytes.translate les supprime en C
+_VALID_BYTES = ''.join(sorted(config.VALID_AMINO_ACIDS)).encode('ascii')
+
 class SequenceValidator:
     """Validateur de séquences protéiques"""
     
@@ -24,13 +30,19 @@ class SequenceValidator:
             clean = ''.join(lines[1:])
         
         # Supprimer espaces
-        clean = clean.replace('\n', '').replace(' ', '').replace('\r', '')
+        clean = clean.translate(_WHITESPACE_TABLE)
         
         return clean, protein_id
     
     @staticmethod
     def validate_characters(sequence: str) -> None:
         """Vérifie les caractères valides"""
+        # Chemin rapide : il ne reste rien une fois les caractères valides
+        # supprimés ('replace' rend tout non-ASCII invalide, sans exception)
+        if not sequence.encode('ascii', 'replace').translate(None, _VALID_BYTES):
+            return
+        
+        # Séquence invalide : détail des caractères pour le message d'erreur
         invalid = set(sequence) - config.VALID_AMINO_ACIDS
         if invalid:
             raise HTTPException(
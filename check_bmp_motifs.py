@@ -1,14 +1,34 @@
 """Check why BMP7 and BMP5 are not detected"""
 import re
 import requests
+from diskcache import Cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from api.config import config
 
 proteins = {
     "P18075": "BMP7",
     "P22003": "BMP5"
 }
 
-pattern_strict = r"R[A-Z](?:K|R)R"  # Notre pattern actuel
-pattern_relaxed = r"R[A-Z]{2}R"     # Pattern plus large (RXXR)
+# Patterns compilés une seule fois et réutilisés pour chaque protéine
+_STRICT = re.compile(config.get_regex_pattern("pcsk567"))  # Notre pattern actuel (serveur)
+_RELAXED = re.compile(r"R[A-Z]{2}R")     # Pattern plus large (RXXR)
+
+# Session partagée : une seule connexion TLS vers rest.uniprot.org pour toutes les protéines
+session = requests.Session()
+session.headers.update({'Accept-Encoding': 'gzip'})
+adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+)
+session.mount('https://', adapter)
+
+# Cache disque des FASTA UniProt : les relances du script ne refont pas les requêtes
+fasta_cache = Cache("/tmp/uniprot_fasta_cache")
+FASTA_CACHE_EXPIRE = 24 * 3600  # 24h
 
 for uniprot_id, name in proteins.items():
     print(f"\n{'='*50}")
@@ -17,20 +37,25 @@ for uniprot_id, name in proteins.items():
     
     # Fetch sequence
     url = f"https://rest.uniprot.org/uniprotkb/{uniprot_id}.fasta"
-    response = requests.get(url)
-    lines = response.text.split('\n')
+    fasta = fasta_cache.get(url)
+    if fasta is None:
+        response = session.get(url)
+        fasta = response.text
+        if response.ok:
+            fasta_cache.set(url, fasta, expire=FASTA_CACHE_EXPIRE)
+    lines = fasta.split('\n')
     sequence = ''.join(lines[1:])
     
     print(f"Sequence length: {len(sequence)} aa")
     
     # Search with strict pattern
-    strict_matches = list(re.finditer(pattern_strict, sequence))
+    strict_matches = list(_STRICT.finditer(sequence))
     print(f"\nStrict pattern R[A-Z](K|R)R: {len(strict_matches)} matches")
     for m in strict_matches:
         print(f"   - {m.group()} at position {m.start() + 1}")
     
     # Search with relaxed pattern
-    relaxed_matches = list(re.finditer(pattern_relaxed, sequence))
+    relaxed_matches = list(_RELAXED.finditer(sequence))
     print(f"\nRelaxed pattern R[A-Z][A-Z]R: {len(relaxed_matches)} matches")
     for m in relaxed_matches:
         print(f"   - {m.group()} at position {m.start() + 1}")
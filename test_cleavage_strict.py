@@ -0,0 +1,66 @@
+"""
+Test du mode strict à la frontière du peptide signal (CleavageDetector.find_sites)
+Run: python test_cleavage_strict.py
+"""
+import regex
+from api.config import config
+from api.services.cleavage import CleavageDetector
+
+SIGNAL_LENGTH = 20
+
+# K juste avant la fin du peptide signal, puis une paire dibasique KR
+BOUNDARY_SEQUENCE = "M" * (SIGNAL_LENGTH - 1) + "K" + "KR" + "E" + "A" * 20
+
+# Même paire KR, précédée d'un résidu non basique
+CONTROL_SEQUENCE = "M" * SIGNAL_LENGTH + "KR" + "E" + "A" * 20
+
+
+def find_strict(sequence: str):
+    return CleavageDetector.find_sites(sequence, "strict", SIGNAL_LENGTH, min_spacing=4)
+
+
+def test_lookbehind_sees_signal_peptide():
+    """
+    Le lookbehind (?<!K|R) voit le K en position signal_length - 1 :
+    KKR n'est pas un site dibasique isolé
+    """
+    assert find_strict(BOUNDARY_SEQUENCE) == []
+
+
+def test_old_slicing_differs():
+    """
+    L'ancien découpage sequence[signal_length:] cachait ce K au lookbehind
+    et rapportait un site : c'est bien ce cas qui a changé
+    """
+    pattern = config.get_regex_pattern("strict")
+    old_matches = list(regex.finditer(pattern, BOUNDARY_SEQUENCE[SIGNAL_LENGTH:]))
+    assert [m.start() + SIGNAL_LENGTH for m in old_matches] == [SIGNAL_LENGTH]
+
+
+def test_isolated_pair_after_boundary():
+    """Sans résidu basique avant, la paire KR reste un site (inchangé)"""
+    sites = find_strict(CONTROL_SEQUENCE)
+    
+    assert [(site.index, site.position, site.motif) for site in sites] == [
+        (SIGNAL_LENGTH, SIGNAL_LENGTH + 2, "KR")
+    ]
+
+
+def test_pair_at_sequence_end():
+    """L'ancre $ accepte toujours une paire en fin de séquence"""
+    sequence = "M" * SIGNAL_LENGTH + "A" * 10 + "RR"
+    sites = find_strict(sequence)
+    
+    assert [site.index for site in sites] == [len(sequence) - 2]
+
+
+if __name__ == "__main__":
+    for test in (
+        test_lookbehind_sees_signal_peptide,
+        test_old_slicing_differs,
+        test_isolated_pair_after_boundary,
+        test_pair_at_sequence_end,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 ALL TESTS PASSED!")
@@ -3,6 +3,9 @@ Test PCSK5/6/7 detection on GDF11
 Run: python test_pcsk567.py
 """
 import re
+import sys
+
+from api.config import config
 
 # ==================== GDF11 SEQUENCE (O95390) ====================
 # Source: UniProt O95390
@@ -16,108 +19,114 @@ NLGLDCDEH SSESRCCRYP LTVDFEAFGW DWIIAPKRYK ANYCSGQCEY MFMQKYPTHT
 HLVQQANPRG SAGPCCTPTK MSPINMLYFN DKQQIIYGKI PGMVVDRCGC S
 """.replace("\n", "").replace(" ", "")
 
-print("=" * 60)
-print("🔬 TEST PCSK5/6/7 DETECTION ON GDF11 (O95390)")
-print("=" * 60)
+# Sortie accumulée puis écrite en une seule fois à la fin
+_BUF = []
+out = _BUF.append
+
+out("=" * 60)
+out("🔬 TEST PCSK5/6/7 DETECTION ON GDF11 (O95390)")
+out("=" * 60)
 
-print(f"\n📊 Sequence length: {len(GDF11_SEQUENCE)} aa")
-print(f"📋 First 50 aa: {GDF11_SEQUENCE[:50]}...")
-print(f"📋 Last 50 aa: ...{GDF11_SEQUENCE[-50:]}")
+out(f"\n📊 Sequence length: {len(GDF11_SEQUENCE)} aa")
+out(f"📋 First 50 aa: {GDF11_SEQUENCE[:50]}...")
+out(f"📋 Last 50 aa: ...{GDF11_SEQUENCE[-50:]}")
 
 # ==================== PATTERN PCSK5/6/7 ====================
 # R-X-(K/R)-R where X = any amino acid
-pattern = r"R[A-Z](?:K|R)R"
+# Même motif que le serveur (api/config.py), compilé une seule fois
+pattern = config.get_regex_pattern("pcsk567")
+PCSK_RE = re.compile(pattern)
 
-print(f"\n🔍 Pattern: {pattern}")
-print("   R = Arginine")
-print("   [A-Z] = Any amino acid")
-print("   (?:K|R) = Lysine or Arginine")
-print("   R = Arginine")
+out(f"\n🔍 Pattern: {pattern}")
+out("   R = Arginine")
+out("   [A-Z] = Any amino acid")
+out("   [KR] = Lysine or Arginine")
+out("   R = Arginine")
 
 # ==================== FIND MATCHES ====================
-matches = list(re.finditer(pattern, GDF11_SEQUENCE))
+matches = list(PCSK_RE.finditer(GDF11_SEQUENCE))
+
+out(f"\n✅ Found {len(matches)} PCSK5/6/7 site(s):")
 
-print(f"\n✅ Found {len(matches)} PCSK5/6/7 site(s):")
+n = len(GDF11_SEQUENCE)
 
 for i, match in enumerate(matches, 1):
     motif = match.group()
     position = match.start()
     cleavage_after = match.end()
     
-    print(f"\n   Site {i}:")
-    print(f"   - Motif: {motif}")
-    print(f"   - Position: {position + 1} (1-indexed)")
-    print(f"   - Cleavage after position: {cleavage_after}")
+    out(f"\n   Site {i}:")
+    out(f"   - Motif: {motif}")
+    out(f"   - Position: {position + 1} (1-indexed)")
+    out(f"   - Cleavage after position: {cleavage_after}")
     
-    # Context around the site
-    context_start = max(0, position - 10)
-    context_end = min(len(GDF11_SEQUENCE), position + 15)
-    context = GDF11_SEQUENCE[context_start:context_end]
+    # Context around the site (le slice s'arrête seul en fin de séquence)
+    context_start = position - 10 if position > 10 else 0
+    context = GDF11_SEQUENCE[context_start:position + 15]
     marker_pos = position - context_start
     
-    print(f"   - Context: ...{context[:marker_pos]}[{context[marker_pos:marker_pos+4]}]{context[marker_pos+4:]}...")
+    out(f"   - Context: ...{context[:marker_pos]}[{context[marker_pos:marker_pos+4]}]{context[marker_pos+4:]}...")
     
-    # Extract mature form (after cleavage)
-    mature_seq = GDF11_SEQUENCE[cleavage_after:]
-    print(f"   - Mature form: {len(mature_seq)} aa")
-    print(f"   - First 50 aa of mature: {mature_seq[:50]}...")
+    # Mature form (after cleavage) : longueur calculée, seuls 50 aa copiés
+    out(f"   - Mature form: {n - cleavage_after} aa")
+    out(f"   - First 50 aa of mature: {GDF11_SEQUENCE[cleavage_after:cleavage_after + 50]}...")
 
 # ==================== VALIDATION ====================
-print("\n" + "=" * 60)
-print("🧪 VALIDATION")
-print("=" * 60)
+out("\n" + "=" * 60)
+out("🧪 VALIDATION")
+out("=" * 60)
 
 # Expected: RSRR should be found (from literature)
 expected_motifs = ["RSRR", "RKRR", "RSKR"]
 found_motifs = [m.group() for m in matches]
 
-print(f"\n📋 Expected motifs (from literature): {expected_motifs}")
-print(f"📋 Found motifs: {found_motifs}")
+# Premier site RSRR, cherché une seule fois (validation + prodomaine)
+rsrr_match = next((m for m in matches if m.group() == "RSRR"), None)
+
+out(f"\n📋 Expected motifs (from literature): {expected_motifs}")
+out(f"📋 Found motifs: {found_motifs}")
 
 # Check for RSRR specifically
-if "RSRR" in found_motifs:
-    print("\n✅ SUCCESS: Found RSRR motif (expected for GDF11)")
+if rsrr_match is not None:
+    out("\n✅ SUCCESS: Found RSRR motif (expected for GDF11)")
+    
+    mature_start = rsrr_match.end()
+    mature_seq = GDF11_SEQUENCE[mature_start:]
     
-    # Find the RSRR match
-    for match in matches:
-        if match.group() == "RSRR":
-            mature_start = match.end()
-            mature_seq = GDF11_SEQUENCE[mature_start:]
-            
-            print(f"\n📊 MATURE GDF11 DETAILS:")
-            print(f"   - Start position: {mature_start + 1}")
-            print(f"   - Length: {len(mature_seq)} aa")
-            print(f"   - Expected length: ~109 aa (from literature)")
-            
-            # Check if length is approximately correct
-            if 100 <= len(mature_seq) <= 120:
-                print(f"   ✅ Length is correct!")
-            else:
-                print(f"   ⚠️ Length differs from expected")
-            
-            print(f"\n   MATURE SEQUENCE:")
-            print(f"   {mature_seq}")
+    out(f"\n📊 MATURE GDF11 DETAILS:")
+    out(f"   - Start position: {mature_start + 1}")
+    out(f"   - Length: {len(mature_seq)} aa")
+    out(f"   - Expected length: ~109 aa (from literature)")
+    
+    # Check if length is approximately correct
+    if 100 <= len(mature_seq) <= 120:
+        out(f"   ✅ Length is correct!")
+    else:
+        out(f"   ⚠️ Length differs from expected")
+    
+    out(f"\n   MATURE SEQUENCE:")
+    out(f"   {mature_seq}")
 else:
-    print("\n❌ FAILED: RSRR motif not found")
-    print("   Check if the sequence is correct")
+    out("\n❌ FAILED: RSRR motif not found")
+    out("   Check if the sequence is correct")
 
 # ==================== ADDITIONAL CHECKS ====================
-print("\n" + "=" * 60)
-print("🔬 ADDITIONAL CHECKS")
-print("=" * 60)
+out("\n" + "=" * 60)
+out("🔬 ADDITIONAL CHECKS")
+out("=" * 60)
 
 # Check for signal peptide
 signal_peptide = GDF11_SEQUENCE[:18]
-print(f"\n📍 Signal peptide (first 18 aa): {signal_peptide}")
+out(f"\n📍 Signal peptide (first 18 aa): {signal_peptide}")
 
 # Check for prodomain
-for match in matches:
-    if match.group() == "RSRR":
-        prodomain = GDF11_SEQUENCE[18:match.start()]
-        print(f"📍 Prodomain (after signal, before RSRR): {len(prodomain)} aa")
-        print(f"   {prodomain[:50]}...")
-        break
-
-print("\n" + "=" * 60)
-print("✅ TEST COMPLETED")
-print("=" * 60)
\ No newline at end of file
+if rsrr_match is not None:
+    prodomain = GDF11_SEQUENCE[18:rsrr_match.start()]
+    out(f"📍 Prodomain (after signal, before RSRR): {len(prodomain)} aa")
+    out(f"   {prodomain[:50]}...")
+
+out("\n" + "=" * 60)
+out("✅ TEST COMPLETED")
+out("=" * 60)
+
+sys.stdout.write("\n".join(_BUF) + "\n")
@@ -1,12 +1,25 @@
 """
 Test PCSK5/6/7 quality - Known substrates from literature
-Run: python test_pcsk567_quality.py
+Run: python test_pcsk567_quality.py [--json]
 """
+import argparse
+import sys
+import orjson
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 
 BASE_URL = "http://localhost:8000"
 
+# Session partagée par tous les substrats (connexions keep-alive réutilisées)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+))
+
 # ==================== KNOWN PCSK5/6/7 SUBSTRATES ====================
 # Source: Table 2 from the paper mentioned by your colleague
 KNOWN_SUBSTRATES = [
@@ -47,12 +60,48 @@ KNOWN_SUBSTRATES = [
     },
 ]
 
-def test_substrate(substrate: dict) -> dict:
-    """Test a known PCSK5/6/7 substrate"""
-    print(f"\n{'='*60}")
-    print(f"🧪 Testing: {substrate['name']}")
-    print(f"   UniProt ID: {substrate['id']}")
-    print(f"{'='*60}")
+# Emoji du résumé par statut (construit une fois)
+STATUS_EMOJI = {
+    "SUCCESS": "✅",
+    "NO_MATURE_FORM": "⚠️",
+    "NOT_FOUND": "❌",
+    "ERROR": "❌",
+    "EXCEPTION": "❌",
+    "UNKNOWN": "❓"
+}
+
+def fetch_batch(substrates: list):
+    """
+    Analyse tous les substrats en une seule requête /analyze/batch
+    Retourne la liste des réponses (même ordre), ou None si la route n'existe pas
+    """
+    response = SESSION.post(
+        f"{BASE_URL}/analyze/batch",
+        json={
+            "requests": [
+                {"proteinId": s["id"], "mode": "pcsk567"}
+                for s in substrates
+            ]
+        },
+        timeout=60
+    )
+    
+    if response.status_code == 404:
+        return None
+    
+    response.raise_for_status()
+    return response.json()["responses"]
+
+def test_substrate(substrate: dict, batch_response: dict = None, verbose: bool = True) -> dict:
+    """Test a known PCSK5/6/7 substrate (batch_response : réponse déjà reçue via /analyze/batch)"""
+    # Sortie accumulée puis imprimée d'un bloc (substrats testés en parallèle)
+    lines = []
+    out = lines.append
+    
+    out(f"\n{'='*60}")
+    out(f"🧪 Testing: {substrate['name']}")
+    out(f"   UniProt ID: {substrate['id']}")
+    out(f"{'='*60}")
     
     result = {
         "id": substrate["id"],
@@ -62,22 +111,29 @@ def test_substrate(substrate: dict) -> dict:
     }
     
     try:
-        response = requests.post(
-            f"{BASE_URL}/analyze",
-            json={
-                "proteinId": substrate["id"],
-                "mode": "pcsk567"
-            },
-            timeout=30
-        )
+        if batch_response is None:
+            response = SESSION.post(
+                f"{BASE_URL}/analyze",
+                json={
+                    "proteinId": substrate["id"],
+                    "mode": "pcsk567"
+                },
+                timeout=30
+            )
+            status_code = response.status_code
+            data = response.json() if status_code == 200 else None
+            error_text = response.text
+        else:
+            status_code = batch_response["status"]
+            data = batch_response.get("data")
+            error_text = str(batch_response.get("detail"))
         
-        if response.status_code == 200:
-            data = response.json()
+        if status_code == 200:
             
-            print(f"\n📊 Results:")
-            print(f"   Sequence length: {data.get('sequenceLength')} aa")
-            print(f"   Cleavage sites found: {data.get('cleavageSitesCount')}")
-            print(f"   Peptides extracted: {len(data.get('peptides', []))}")
+            out(f"\n📊 Results:")
+            out(f"   Sequence length: {data.get('sequenceLength')} aa")
+            out(f"   Cleavage sites found: {data.get('cleavageSitesCount')}")
+            out(f"   Peptides extracted: {len(data.get('peptides', []))}")
             
             result["details"]["sequenceLength"] = data.get("sequenceLength")
             result["details"]["cleavageSites"] = data.get("cleavageSitesCount")
@@ -86,18 +142,18 @@ def test_substrate(substrate: dict) -> dict:
             # Check cleavage sites
             sites = data.get("cleavageSites", [])
             if sites:
-                print(f"\n✂️ Cleavage sites:")
+                out(f"\n✂️ Cleavage sites:")
                 for site in sites:
-                    print(f"   - {site['motif']} at position {site['position']}")
+                    out(f"   - {site['motif']} at position {site['position']}")
                 
                 # Check expected motif
                 if substrate["expected_motif"]:
                     found_motifs = [s["motif"] for s in sites]
                     if substrate["expected_motif"] in found_motifs:
-                        print(f"   ✅ Expected motif {substrate['expected_motif']} FOUND!")
+                        out(f"   ✅ Expected motif {substrate['expected_motif']} FOUND!")
                         result["details"]["motif_match"] = True
                     else:
-                        print(f"   ⚠️ Expected {substrate['expected_motif']}, found {found_motifs}")
+                        out(f"   ⚠️ Expected {substrate['expected_motif']}, found {found_motifs}")
                         result["details"]["motif_match"] = False
             
             # Check peptides
@@ -105,96 +161,118 @@ def test_substrate(substrate: dict) -> dict:
             mature_forms = [p for p in peptides if p.get("peptideType") == "mature_form"]
             
             if mature_forms:
-                print(f"\n🧬 Mature form(s):")
+                out(f"\n🧬 Mature form(s):")
                 for mf in mature_forms:
-                    print(f"   - Length: {mf['length']} aa")
-                    print(f"   - Start: {mf['sequence'][:20]}...")
-                    print(f"   - Position: {mf['start']} → {mf['end']}")
+                    out(f"   - Length: {mf['length']} aa")
+                    out(f"   - Start: {mf['sequence'][:20]}...")
+                    out(f"   - Position: {mf['start']} → {mf['end']}")
                     
                     # Check expected length
                     if substrate["expected_mature_length"]:
                         min_len, max_len = substrate["expected_mature_length"]
                         if min_len <= mf["length"] <= max_len:
-                            print(f"   ✅ Length {mf['length']} is within expected range ({min_len}-{max_len})")
+                            out(f"   ✅ Length {mf['length']} is within expected range ({min_len}-{max_len})")
                             result["details"]["length_match"] = True
                         else:
-                            print(f"   ⚠️ Length {mf['length']} outside expected range ({min_len}-{max_len})")
+                            out(f"   ⚠️ Length {mf['length']} outside expected range ({min_len}-{max_len})")
                             result["details"]["length_match"] = False
                     
                     # Check expected start
                     if substrate["expected_mature_start"]:
                         if mf["sequence"].startswith(substrate["expected_mature_start"]):
-                            print(f"   ✅ Starts with expected '{substrate['expected_mature_start']}'")
+                            out(f"   ✅ Starts with expected '{substrate['expected_mature_start']}'")
                             result["details"]["start_match"] = True
                         else:
-                            print(f"   ⚠️ Expected start '{substrate['expected_mature_start']}', got '{mf['sequence'][:5]}'")
+                            out(f"   ⚠️ Expected start '{substrate['expected_mature_start']}', got '{mf['sequence'][:5]}'")
                             result["details"]["start_match"] = False
                 
                 result["status"] = "SUCCESS"
             else:
-                print(f"\n⚠️ No mature form found!")
+                out(f"\n⚠️ No mature form found!")
                 result["status"] = "NO_MATURE_FORM"
         
-        elif response.status_code == 404:
-            print(f"❌ Protein not found (might not be secreted)")
+        elif status_code == 404:
+            out(f"❌ Protein not found (might not be secreted)")
             result["status"] = "NOT_FOUND"
         else:
-            print(f"❌ Error: {response.status_code}")
-            print(f"   {response.text[:200]}")
+            out(f"❌ Error: {status_code}")
+            out(f"   {error_text[:200]}")
             result["status"] = "ERROR"
     
     except Exception as e:
-        print(f"❌ Exception: {e}")
+        out(f"❌ Exception: {e}")
         result["status"] = "EXCEPTION"
     
+    if verbose:
+        print("\n".join(lines))
     return result
 
-def main():
-    print("="*60)
-    print("🔬 PCSK5/6/7 QUALITY TEST")
-    print("   Testing known substrates from literature")
-    print("="*60)
+def main(as_json: bool = False):
+    verbose = not as_json
     
-    results = []
+    if verbose:
+        print("="*60)
+        print("🔬 PCSK5/6/7 QUALITY TEST")
+        print("   Testing known substrates from literature")
+        print("="*60)
     
-    for substrate in KNOWN_SUBSTRATES:
-        result = test_substrate(substrate)
-        results.append(result)
+    # Un seul aller-retour pour tous les substrats
+    try:
+        batch = fetch_batch(KNOWN_SUBSTRATES)
+    except Exception as e:
+        print(f"⚠️ Batch request failed ({e}), falling back to per-substrate requests", file=sys.stderr)
+        batch = None
+    
+    if batch is not None:
+        results = [test_substrate(s, r, verbose) for s, r in zip(KNOWN_SUBSTRATES, batch)]
+    else:
+        # Serveur sans /analyze/batch : requêtes en parallèle (I/O réseau),
+        # map conserve l'ordre des substrats
+        with ThreadPoolExecutor(max_workers=len(KNOWN_SUBSTRATES)) as executor:
+            results = list(executor.map(
+                lambda s: test_substrate(s, verbose=verbose),
+                KNOWN_SUBSTRATES
+            ))
     
-    # Summary
-    print("\n" + "="*60)
-    print("📋 SUMMARY")
-    print("="*60)
+    # Sortie structurée pour un traitement en aval (pas de résumé texte)
+    if as_json:
+        sys.stdout.buffer.write(orjson.dumps(results, option=orjson.OPT_INDENT_2) + b"\n")
+        return
+    
+    # Summary (écrit en une seule fois)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("📋 SUMMARY")
+    out("="*60)
     
     success_count = 0
     for r in results:
-        status_emoji = {
-            "SUCCESS": "✅",
-            "NO_MATURE_FORM": "⚠️",
-            "NOT_FOUND": "❌",
-            "ERROR": "❌",
-            "EXCEPTION": "❌",
-            "UNKNOWN": "❓"
-        }.get(r["status"], "❓")
+        status_emoji = STATUS_EMOJI.get(r["status"], "❓")
         
-        print(f"   {status_emoji} {r['id']} ({r['name'].split('(')[0].strip()}): {r['status']}")
+        out(f"   {status_emoji} {r['id']} ({r['name'].split('(')[0].strip()}): {r['status']}")
         
         if r["status"] == "SUCCESS":
             success_count += 1
             details = r.get("details", {})
             if details.get("motif_match") is False:
-                print(f"      └─ ⚠️ Motif mismatch")
+                out(f"      └─ ⚠️ Motif mismatch")
             if details.get("length_match") is False:
-                print(f"      └─ ⚠️ Length outside expected range")
+                out(f"      └─ ⚠️ Length outside expected range")
     
-    print(f"\n🎯 Success rate: {success_count}/{len(results)} ({100*success_count/len(results):.0f}%)")
+    out(f"\n🎯 Success rate: {success_count}/{len(results)} ({100*success_count/len(results):.0f}%)")
     
     if success_count == len(results):
-        print("\n🎉 ALL TESTS PASSED!")
+        out("\n🎉 ALL TESTS PASSED!")
     elif success_count > 0:
-        print(f"\n⚠️ {len(results) - success_count} test(s) need attention")
+        out(f"\n⚠️ {len(results) - success_count} test(s) need attention")
     else:
-        print("\n❌ All tests failed - check the algorithm")
+        out("\n❌ All tests failed - check the algorithm")
+    
+    print("\n".join(lines))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--json", action="store_true", help="Write results as JSON instead of the report")
+    main(as_json=parser.parse_args().json)
\ No newline at end of file